@@ -1,21 +1,167 @@
 import sys
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QVBoxLayout, QHBoxLayout, QTextEdit, QInputDialog, QMessageBox, QDialog, QDialogButtonBox, QFileDialog,QAbstractItemView, QScrollArea, QComboBox
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtCore import Qt, QRect, QAbstractItemModel, QModelIndex, QObject, QRunnable, QThreadPool, QStringListModel, pyqtSignal
+from PyQt6.QtWidgets import QTreeView, QProgressBar, QProgressDialog, QCompleter
 from TreeOfLife import *
 
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int, int)
+    batch = pyqtSignal(list)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    """
+    Runs task(worker) on the thread pool. The task reports back through worker.signals and should stop when worker.cancelled is set.
+    The pool does not own the workers, so start keeps each one in active until its result has been delivered, even if whoever started it has dropped it.
+    """
+    active = set()
+
+    def __init__(self, task):
+        super().__init__()
+        self.task = task
+        self.cancelled = False
+        self.signals = WorkerSignals()
+        self.setAutoDelete(False)
+        self.signals.finished.connect(self.release)
+        self.signals.failed.connect(self.release)
+
+    def start(self):
+        Worker.active.add(self)
+        QThreadPool.globalInstance().start(self)
+
+    def release(self, result=None):
+        Worker.active.discard(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            result = self.task(self)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class TreeModel(QAbstractItemModel):
+    """
+    An item model read directly from Group._tree. The subbranches of a group are only looked up when its row is expanded, and then fetched in batches of batch_size rows.
+    """
+    batch_size = 256
+
+    class Node:
+        def __init__(self, key, parent, row):
+            self.key = key
+            self.parent = parent
+            self.row = row
+            self.children = None
+            self.fetched = []
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = self.Node(None, None, 0)
+
+    def refresh(self):
+        self.beginResetModel()
+        self.root = self.Node(None, None, 0)
+        self.endResetModel()
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def key(self, index):
+        return self.node(index).key if index.isValid() else None
+
+    def subBranches(self, node):
+        if node.children is None:
+            keys = Group._typeIndex.get("Life", ()) if node.key is None else Group._tree.get(node.key, ())
+            node.children = sorted(keys, key=lambda key: f"{key[1]} ({key[0]})")
+        return node.children
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if column != 0 or row < 0 or row >= len(node.fetched):
+            return QModelIndex()
+        return self.createIndex(row, column, node.fetched[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).fetched)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node.children is not None:
+            return bool(node.children)
+        return bool(Group._typeIndex.get("Life")) if node.key is None else bool(Group._tree.get(node.key))
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return len(node.fetched) < len(self.subBranches(node))
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        keys = self.subBranches(node)[len(node.fetched):len(node.fetched) + self.batch_size]
+        if not keys:
+            return
+        first = len(node.fetched)
+        self.beginInsertRows(parent, first, first + len(keys) - 1)
+        node.fetched.extend(self.Node(key, node, first + i) for i, key in enumerate(keys))
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        key = index.internalPointer().key
+        return f"{key[1]} ({key[0]})"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return "Tree Of Life"
+        return None
+
+
 class LifeHeirarchi(QWidget):
     default_font = QFont("B Nazanin", 12)
     
 
 
     class Dialog(QDialog):
+        batch_size = 500
+        page_size = 2000
+        suggest_limit = 10
+
         def __init__(self, windowTitle : str ,parent=None):
             super().__init__(parent)
             self.setWindowTitle(windowTitle)
             self.setModal(True)
             self.adjustSize()
 
+        def groupView(self):
+            group_view = QTreeView()
+            group_view.setFont(LifeHeirarchi.default_font)
+            group_view.setModel(self.parent().tree_model)
+            group_view.setHeaderHidden(True)
+            group_view.setUniformRowHeights(True)
+            group_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+            return group_view
+
         def text_dialog(self, input_txt):
             vbox = QVBoxLayout()
             label = QLabel(input_txt)
@@ -45,6 +191,12 @@ class LifeHeirarchi(QWidget):
             query_hbox.addWidget(query_text)
             query_hbox.addWidget(query)
 
+            suggestions = QStringListModel()
+            completer = QCompleter(suggestions, query)
+            completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+            completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+            query.setCompleter(completer)
+
 
             combo_hbox = QHBoxLayout()
             combo_txt = QLabel("Choose Matching Type : ")
@@ -56,14 +208,35 @@ class LifeHeirarchi(QWidget):
             combo_box.addItem("inclusive")
             combo_box.addItem("exact")
             combo_box.addItem("regular expression")
+            combo_box.addItem("fuzzy")
             combo_box.setCurrentIndex(0)
             combo_hbox.addWidget(combo_box)
 
+            def suggest(text):
+                # names that start with the text, then the closest misspellings, as the user types
+                names = []
+                if text and combo_box.currentText() != "regular expression":
+                    with Group._lock.read():
+                        names = Group.suggest(text, self.suggest_limit)
+                        if len(names) < self.suggest_limit:
+                            names += [name for name, distance in Group.fuzzySearch(text, self.suggest_limit) if name not in names]
+                suggestions.setStringList(names[:self.suggest_limit])
+
+            query.textEdited.connect(suggest)
+
             self.vbox.addLayout(combo_hbox)
             
 
             self.vbox.addLayout(query_hbox)
 
+            order_hbox = QHBoxLayout()
+            order_text = QLabel("Order By Attribute (optional, - for descending): ")
+            order_text.setFont(LifeHeirarchi.default_font)
+            order_by = QLineEdit()
+            order_by.setFont(LifeHeirarchi.default_font)
+            order_hbox.addWidget(order_text)
+            order_hbox.addWidget(order_by)
+            self.vbox.addLayout(order_hbox)
 
             self.filter_box = QVBoxLayout()
             self.vbox.addLayout(self.filter_box)
@@ -136,23 +309,105 @@ class LifeHeirarchi(QWidget):
             self.table.setFont(LifeHeirarchi.default_font)
 
 
+            progress_hbox = QHBoxLayout()
+            progress_bar = QProgressBar()
+            progress_bar.setVisible(False)
+            cancel_btn = QPushButton("Cancel")
+            cancel_btn.setFont(LifeHeirarchi.default_font)
+            cancel_btn.setVisible(False)
+            progress_hbox.addWidget(progress_bar)
+            progress_hbox.addWidget(cancel_btn)
+            self.vbox.addLayout(progress_hbox)
+
+            more_btn = QPushButton("Show More")
+            more_btn.setFont(LifeHeirarchi.default_font)
+            more_btn.setVisible(False)
+
             self.search_results = dict()
+            self.search_arguments = None
+            self.worker = None
             def search():
+                stop_worker()
                 filters = dict()
-                for val in self.filters.values():
-                    filters[val[0]] = (val[1], val[2])
-                self.search_results = Group.advancedSearch(superSet.text(), query.text(), combo_box.currentText(), filters)
-                row = 0
+                for attr, op, val in self.filters.values():
+                    if not attr.text():
+                        continue
+                    value = val.text()
+                    if op.currentText() == "range":
+                        value = tuple(value.split(",", 1)) if "," in value else (value, value)
+                    filters[attr.text()] = (op.currentText(), value)
+                self.search_arguments = (superSet.text(), query.text(), combo_box.currentText(), filters, False, order_by.text().strip() or None)
+
+                self.search_results = dict()
                 self.table.setColumnCount(2)
-                self.table.setRowCount(len(self.search_results.keys()))
+                self.table.setRowCount(0)
                 self.table.setHorizontalHeaderLabels(["Type", "Name"])
-                for type, name in self.search_results.keys():
-                    self.table.setItem(row, 0, QTableWidgetItem(type))
-                    self.table.setItem(row, 1, QTableWidgetItem(name))
+                load_page()
+
+            def load_page():
+                # the results come a page at a time, and one extra result tells whether there is a next page
+                stop_worker()
+                arguments, offset = self.search_arguments, self.table.rowCount()
+
+                def task(worker):
+                    with Group._lock.read():
+                        results = list(Group.iterSearch(*arguments, limit=self.page_size + 1, offset=offset))
+                    page = results[:self.page_size]
+                    for start in range(0, len(page), self.batch_size):
+                        if worker.cancelled:
+                            return None
+                        worker.signals.batch.emit(page[start:start + self.batch_size])
+                        worker.signals.progress.emit(min(start + self.batch_size, len(page)), len(page))
+                    return len(results) > self.page_size
+
+                more_btn.setVisible(False)
+                progress_bar.setRange(0, 0)
+                progress_bar.setVisible(True)
+                cancel_btn.setVisible(True)
+
+                self.worker = Worker(task)
+                self.worker.signals.batch.connect(add_rows)
+                self.worker.signals.progress.connect(show_progress)
+                self.worker.signals.finished.connect(search_done)
+                self.worker.signals.failed.connect(search_failed)
+                self.worker.start()
+
+            def add_rows(rows):
+                self.table.setUpdatesEnabled(False)
+                row = self.table.rowCount()
+                self.table.setRowCount(row + len(rows))
+                for key, instance in rows:
+                    self.search_results[key] = instance
+                    self.table.setItem(row, 0, QTableWidgetItem(key[0]))
+                    self.table.setItem(row, 1, QTableWidgetItem(key[1]))
                     row += 1
+                self.table.setUpdatesEnabled(True)
+
+            def show_progress(done, total):
+                progress_bar.setRange(0, total)
+                progress_bar.setValue(done)
+
+            def stop_worker():
+                if self.worker is not None:
+                    self.worker.cancel()
+                    for signal, slot in ((self.worker.signals.batch, add_rows), (self.worker.signals.progress, show_progress), (self.worker.signals.finished, search_done), (self.worker.signals.failed, search_failed)):
+                        signal.disconnect(slot)
+                    self.worker = None
+                progress_bar.setVisible(False)
+                cancel_btn.setVisible(False)
+
+            def search_done(result=None):
+                stop_worker()
+                more_btn.setVisible(bool(result))
                 self.adjustSize()
 
+            def search_failed(error):
+                search_done()
+                QMessageBox.warning(self, "Search", str(error))
+
             search_btn.clicked.connect(search)
+            cancel_btn.clicked.connect(stop_worker)
+            more_btn.clicked.connect(load_page)
 
 
 
@@ -174,6 +429,7 @@ class LifeHeirarchi(QWidget):
 
             layout = QVBoxLayout()
             layout.addWidget(scroll_area)
+            layout.addWidget(more_btn)
             self.vbox.addLayout(layout)
             self.setLayout(self.vbox)
 
@@ -188,7 +444,8 @@ class LifeHeirarchi(QWidget):
             self.vbox.addWidget(input_text)
 
             def clicked_on():
-                Group.createNew(input_text.toPlainText())
+                with Group._lock.write():
+                    Group.createNew(input_text.toPlainText())
                 self.close()
 
             btn = QPushButton("Add")
@@ -201,20 +458,18 @@ class LifeHeirarchi(QWidget):
         def editDialog(self):
             self.vbox = QVBoxLayout()
             self.setLayout(self.vbox)
-            group_combo = QComboBox()
-            group_combo.setFont(LifeHeirarchi.default_font)
+            group_view = self.groupView()
             attr_combo = QComboBox()
             attr_combo.setFont(LifeHeirarchi.default_font)
-            
-            for instance in Group._instances.keys():
-                group_combo.addItem(str(instance))
-            group_combo.setCurrentIndex(0)
 
             group_btn = QPushButton("Choose Group")
             group_btn.setFont(LifeHeirarchi.default_font)
             def group_clicked():
                 attr_combo.clear()
-                instance = Group._instances[list(Group._instances.keys())[group_combo.currentIndex()]]
+                key = group_view.model().key(group_view.currentIndex())
+                if key is None:
+                    return
+                instance = Group._instances[key]
                 try:
                     for attr in instance.attributes.keys():
                         attr_combo.addItem(attr)
@@ -223,7 +478,7 @@ class LifeHeirarchi(QWidget):
             group_btn.clicked.connect(group_clicked)
             
             h1 = QHBoxLayout()
-            h1.addWidget(group_combo)
+            h1.addWidget(group_view)
             h1.addWidget(group_btn)
 
             replace = QLineEdit()
@@ -234,9 +489,13 @@ class LifeHeirarchi(QWidget):
             btn.setFont(LifeHeirarchi.default_font)
 
             def edit():
-                instance = Group._instances[list(Group._instances.keys())[group_combo.currentIndex()]]
+                key = group_view.model().key(group_view.currentIndex())
+                if key is None:
+                    return
+                instance = Group._instances[key]
                 newData= (attr_combo.currentText(), replace.text())
-                instance.info = newData
+                with Group._lock.write():
+                    instance.info = newData
                 self.close()
 
             btn.clicked.connect(edit)
@@ -253,22 +512,20 @@ class LifeHeirarchi(QWidget):
         def deleteDialog(self):
             self.vbox = QVBoxLayout()
             self.setLayout(self.vbox)
-            group_combo = QComboBox()
-            group_combo.setFont(LifeHeirarchi.default_font)
-            
-            for instance in Group._instances.keys():
-                group_combo.addItem(str(instance))
-            group_combo.setCurrentIndex(0)
+            group_view = self.groupView()
 
             del_btn = QPushButton("Choose Group")
             del_btn.setFont(LifeHeirarchi.default_font)
             def delete_group():
-                ins = list(Group._instances.keys())[group_combo.currentIndex()]
-                Group.delete(ins[0], ins[1])
+                ins = group_view.model().key(group_view.currentIndex())
+                if ins is None:
+                    return
+                with Group._lock.write():
+                    Group.delete(ins[0], ins[1])
                 self.close()
             del_btn.clicked.connect(delete_group)
 
-            self.vbox.addWidget(group_combo)
+            self.vbox.addWidget(group_view)
             self.vbox.addWidget(del_btn)
 
             self.adjustSize()
@@ -288,6 +545,16 @@ class LifeHeirarchi(QWidget):
         tree_font = QFont("Times New Roman", 18)
         self.tree_label = QLabel('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
         self.tree_label.setFont(tree_font)
+        self.tree_label.setVisible(not Group._instances)  # the tree may already be loaded, e.g. replayed from a journal
+        self.tree_version = Group._treeVersion
+
+        self.tree_model = TreeModel(self)
+        self.tree_view = QTreeView()
+        self.tree_view.setFont(tree_font)
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setMinimumSize(600, 500)
+        self.tree_view.setVisible(bool(Group._instances))
 
         input_layout = QHBoxLayout() 
 
@@ -323,6 +590,7 @@ class LifeHeirarchi(QWidget):
         
         self.main_layout = QVBoxLayout()
         self.main_layout.addWidget(self.tree_label)
+        self.main_layout.addWidget(self.tree_view)
         self.main_layout.addLayout(input_layout)
         self.main_layout.addLayout(edit_layout)
         self.main_layout.addWidget(search_btn)
@@ -331,20 +599,49 @@ class LifeHeirarchi(QWidget):
         # Create a central widget and set the main layout
         self.setLayout(self.main_layout)
         self.adjustSize()
-        self.setFixedSize(self.size().width(), self.size().height())
+
+    def refreshTree(self):
+        if Group._treeVersion == self.tree_version:
+            return
+        self.tree_version = Group._treeVersion
+        self.tree_model.refresh()
+        self.tree_label.setVisible(not Group._instances)
+        self.tree_view.setVisible(bool(Group._instances))
+        self.adjustSize()
 
     def fileDialog(self):
         file_dialog = QFileDialog()
         file_dialog.setNameFilter("Text Files (*.txt)")
 
-        if file_dialog.exec() == QFileDialog.DialogCode.Accepted:
-            selected_file = file_dialog.selectedFiles()[0]
-            file = selected_file
-            Group.readFromFile(file)
-        if Group._instances:
-            self.tree_label.setText(str(Group.fullTreeView()))
-        else:
-            self.tree_label.setText('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
+        if file_dialog.exec() != QFileDialog.DialogCode.Accepted:
+            return
+        selected_file = file_dialog.selectedFiles()[0]
+        file = selected_file
+
+        progress_dialog = QProgressDialog("Reading " + file, "Cancel", 0, 100, self)
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+
+        def task(worker):
+            def progress(done, size):
+                if worker.cancelled:
+                    raise LoadCancelledException
+                worker.signals.progress.emit(done, size)
+            with Group._lock.write():
+                return Group.streamFromFile(file, bulk=True, progress=progress)
+
+        def done(error=None):
+            progress_dialog.close()
+            if error is not None and not isinstance(error, LoadCancelledException):
+                QMessageBox.warning(self, "Read From Text File", f"Could not read the file: {type(error).__name__} {error}")
+            self.refreshTree()
+
+        worker = self.load_worker = Worker(task)
+        worker.signals.progress.connect(lambda done, size: progress_dialog.setValue(done * 100 // size if size else 100))
+        worker.signals.finished.connect(lambda result: done())
+        worker.signals.failed.connect(done)
+        progress_dialog.canceled.connect(worker.cancel)
+        worker.start()
 
     
 
@@ -352,41 +649,35 @@ class LifeHeirarchi(QWidget):
         dialog = self.Dialog("Add Group", self)
         dialog.addDialog()
         dialog.exec()
-        if Group._instances:
-            self.tree_label.setText(str(Group.fullTreeView()))
-        else:
-            self.tree_label.setText('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
+        self.refreshTree()
 
     def editGroup(self):
         dialog = self.Dialog("Delete", self)
         dialog.editDialog()
         dialog.exec()
-        if Group._instances:
-            self.tree_label.setText(str(Group.fullTreeView()))
-        else:
-            self.tree_label.setText('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
+        self.refreshTree()
 
     def removeGroup(self):
         dialog = self.Dialog("Delete", self)
         dialog.deleteDialog()
         dialog.exec()
-        if Group._instances:
-            self.tree_label.setText(str(Group.fullTreeView()))
-        else:
-            self.tree_label.setText('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
+        self.refreshTree()
 
     def search(self):
         dialog = self.Dialog("Search", self)
         dialog.searchDialog()
         dialog.exec()
-        if Group._instances:
-            self.tree_label.setText(str(Group.fullTreeView()))
-        else:
-            self.tree_label.setText('Life\n└── Domain\n    └── Kingdom\n        └── Phylum\n            └── Class\n                └── Order\n                    └── Family\n                        └── Genus\n                            └── Species\n')
+        self.refreshTree()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
 
+    # python GUI.py [journal [base snapshot]] keeps the changes in a journal that is replayed on the next start
+    arguments = app.arguments()[1:]
+    if arguments:
+        Group.openJournal(arguments[0], arguments[1] if len(arguments) > 1 else None)
+        app.aboutToQuit.connect(Group.closeJournal)
+
     window = LifeHeirarchi()
     window.show()
 
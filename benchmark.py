@@ -0,0 +1,309 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from main import Group
+
+RANKS = ["Domain", "Kingdom", "Phylum", "Class", "Order", "Family", "Genus"]
+COLORS = ["Red", "Green", "Blue", "Yellow", "Black"]
+
+
+def syntheticRecords(species: int, fanout: int = 4, prefix: str = "Bench", depth: int = len(RANKS), attributes: int = 0) -> list:
+    """
+    Generates the records of a synthetic tree with a Life at the top, fanout subbranches for every rank down to the lowest one, and the species spread over the groups of the lowest rank.
+
+    - Args:
+        - species (int): Number of species
+        - fanout (int, optional): Number of subbranches of every group above the lowest rank. Defaults to 4.
+        - prefix (str, optional): Prefix of every name, so several trees can live side by side. Defaults to "Bench".
+        - depth (int, optional): Number of ranks between Life and the species. The ranks after Genus are named Rank 8, Rank 9 and so on. Defaults to 7.
+        - attributes (int, optional): Number of extra attributes of every group and species. The first one is a string color and the others are numbers. Defaults to 0.
+
+    - Returns:
+        - list: Records in the format returned by Group.parseLine
+    """
+    ranks = (RANKS + [f"Rank {i + 1}" for i in range(len(RANKS), depth)])[:depth]
+    life = ("Life", f"{prefix} Life")
+    records = [(life[0], life[1], None, None, extraAttributes(0, attributes), None)]
+    level = [life]
+    for rank in ranks:
+        nextLevel = []
+        for superSet in level:
+            for i in range(fanout):
+                key = (rank, f"{prefix} {rank} {len(nextLevel)}")
+                records.append((key[0], key[1], superSet, None, {"Rank": len(nextLevel), **extraAttributes(len(nextLevel), attributes)}, None))
+                nextLevel.append(key)
+        level = nextLevel
+    for i in range(species):
+        records.append(("Species", f"{prefix} Species {i}", level[i % len(level)], None, extraAttributes(i, attributes), (i % 90, i % 500, i % 40)))
+    return records
+
+
+def extraAttributes(number: int, attributes: int) -> dict:
+    """
+    Returns the extra attributes of the given synthetic record: a color followed by numbers derived from the number of the record.
+
+    - Args:
+        - number (int): Number of the record within its rank
+        - attributes (int): Number of attributes
+
+    - Returns:
+        - dict: The attributes, with numbers before the color
+    """
+    values = {f"Attr{j}": (number * (j + 7)) % 1000 for j in range(1, attributes)}
+    if attributes:
+        values["color"] = COLORS[number % len(COLORS)]
+    return values
+
+
+def formatRecord(record: tuple) -> str:
+    """
+    Renders a record as a line of the sample.txt format, which both readFromFile and parseLine can read back. A string attribute is always written last, since readFromFile drops the last character of the last value.
+
+    - Args:
+        - record (tuple): A record in the format returned by Group.parseLine
+
+    - Returns:
+        - str: The line, without the newline
+    """
+    type, name, superSet, info, attributes, traits = record
+    fields = [f'type="{type}"', f'name="{name}"']
+    if superSet is not None:
+        fields.append(f'superSet=("{superSet[0]}", "{superSet[1]}")')
+    if traits is not None:
+        fields.extend(f"{trait}={value}" for trait, value in zip(("age", "weight", "size"), traits))
+    if info is not None:
+        fields.append(f'info="{info}"')
+    if attributes:
+        values = sorted(attributes.items(), key=lambda item: isinstance(item[1], str))
+        fields.append("extraAttr=(" + ", ".join(f'{key}="{value}"' if isinstance(value, str) else f"{key}={value}" for key, value in values) + ")")
+    return "(" + ", ".join(fields) + ")"
+
+
+def writeTaxonomy(fileName: str, nodes: int, fanout: int = None, depth: int = len(RANKS), attributes: int = 3, prefix: str = "Bench") -> int:
+    """
+    Writes a synthetic taxonomy of about the given number of nodes to a file in the sample.txt format. The output only depends on the arguments, so the same file is generated on every run.
+
+    - Args:
+        - fileName (str): Path of the text file
+        - nodes (int): Number of groups and species. It is raised to the number of groups if that is bigger.
+        - fanout (int, optional): Number of subbranches of every group above the lowest rank. Defaults to the fanout that makes about a tenth of the nodes groups.
+        - depth (int, optional): Number of ranks between Life and the species. Defaults to 7.
+        - attributes (int, optional): Number of extra attributes of every line, at least 1, so that the last one is the string color. Defaults to 3.
+        - prefix (str, optional): Prefix of every name. Defaults to "Bench".
+
+    - Returns:
+        - int: The number of written lines
+    """
+    if fanout is None:
+        fanout = max(2, round((nodes / 10) ** (1 / depth)))
+    groups = sum(fanout ** level for level in range(depth + 1))
+    records = syntheticRecords(species=max(nodes - groups, 0), fanout=fanout, prefix=prefix, depth=depth, attributes=max(attributes, 1))
+    with open(fileName, "wt") as f:
+        for record in records:
+            f.write(formatRecord(record) + "\n")
+    return len(records)
+
+
+def benchmarkDelete(nodes: int = 100_000) -> dict:
+    """
+    Bulk loads a subtree of about the given number of nodes and times deleting it with a single Group.delete call.
+
+    - Args:
+        - nodes (int, optional): Number of nodes in the deleted subtree. Defaults to 100000.
+
+    - Returns:
+        - dict: The number of deleted nodes and the elapsed seconds
+    """
+    records = syntheticRecords(species=nodes, prefix="Delete")
+    Group.bulkLoad(records)
+    start = time.perf_counter()
+    deleted = Group.delete("Life", "Delete Life")
+    return {"deleted": deleted, "seconds": time.perf_counter() - start}
+
+
+def benchmarkDeepDelete(depth: int = 2_000) -> dict:
+    """
+    Bulk loads a chain of groups deeper than the recursion limit and times deleting it.
+
+    - Args:
+        - depth (int, optional): Length of the chain. Defaults to 2000.
+
+    - Returns:
+        - dict: The number of deleted nodes and the elapsed seconds
+    """
+    records = [("Life", "Deep Life", None, None, {}, None)]
+    superSet = ("Life", "Deep Life")
+    for i in range(depth):
+        records.append(("Genus", f"Deep Genus {i}", superSet, None, {}, None))
+        superSet = ("Genus", f"Deep Genus {i}")
+    Group.bulkLoad(records)
+    start = time.perf_counter()
+    deleted = Group.delete("Life", "Deep Life")
+    return {"deleted": deleted, "seconds": time.perf_counter() - start}
+
+
+def benchmarkMemory(species: int = 1_000_000) -> dict:
+    """
+    Bulk loads a synthetic tree with the given number of species and measures the memory it holds with tracemalloc, including every index.
+
+    - Args:
+        - species (int, optional): Number of species. Defaults to 1000000.
+
+    - Returns:
+        - dict: The number of loaded nodes, the traced bytes and the bytes per node
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = syntheticRecords(species=species, prefix="Memory")
+    nodes = Group.bulkLoad(records)
+    del records
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    Group.delete("Life", "Memory Life")
+    return {"nodes": nodes, "bytes": size, "bytesPerNode": size / nodes}
+
+
+def timed(function, repeat: int = 5) -> dict:
+    """
+    Calls a function repeat times and times every call.
+
+    - Args:
+        - function (callable): The function, called without arguments
+        - repeat (int, optional): Number of calls. Defaults to 5.
+
+    - Returns:
+        - dict: The median and the minimum seconds, and the result of the last call
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "result": result}
+
+
+def benchmarkOperations(nodes: int, directory: str, repeat: int = 5) -> dict:
+    """
+    Writes a synthetic taxonomy of the given size, reads it with readFromFile, and times the hot paths of Group on it: advancedSearch in every match_type and with every filter operator, tree, completeAttr, rendering the full tree view, and delete. The tree is deleted at the end.
+
+    - Args:
+        - nodes (int): Number of groups and species
+        - directory (str): Directory of the generated file
+        - repeat (int, optional): Number of calls of every timed operation. Defaults to 5.
+
+    - Returns:
+        - dict: The seconds of every operation, as {"median": ..., "min": ...}, and the number of results, keyed by the name of the operation
+    """
+    fileName = os.path.join(directory, f"taxonomy-{nodes}.txt")
+    lines = writeTaxonomy(fileName, nodes)
+    results = {"nodes": lines}
+
+    def record(name: str, function, repeat: int = repeat) -> None:
+        measured = timed(function, repeat)
+        result = measured.pop("result")
+        if isinstance(result, int):
+            measured["results"] = result
+        elif hasattr(result, "__len__") and not isinstance(result, str):
+            measured["results"] = len(result)
+        results[name] = measured
+
+    gc.collect()
+    record("readFromFile", lambda: Group.readFromFile(fileName), repeat=1)
+    life = ("Life", "Bench Life")
+    genus = ("Genus", "Bench Genus 1")
+    species = ("Species", f"Bench Species {max(lines // 2, 1)}")
+    if species not in Group._instances:
+        species = genus
+
+    def search(**arguments) -> dict:
+        Group.clearSearchCache()  # time the search itself, not the result cache
+        return Group.advancedSearch(**arguments)
+
+    record("advancedSearch inclusive", lambda: search(query="Species 12", match_type="inclusive"))
+    record("advancedSearch exact", lambda: search(query=species[1], match_type="exact"))
+    record("advancedSearch regular expression", lambda: search(query=r"Bench Species 1\d{2}", match_type="regular expression"))
+    record("advancedSearch fuzzy", lambda: search(query=species[1].replace("Species", "Speceis"), match_type="fuzzy"))
+    record("advancedSearch superSet", lambda: search(superSet=genus, query="Species", match_type="inclusive"))
+    for name, filter in [("exact", ("exact", "Blue")), ("range", ("range", (100, 200))), ("lt", ("lt", 100)), ("lte", ("lte", 100)), ("gt", ("gt", 400)), ("gte", ("gte", 400))]:
+        attr = "color" if name == "exact" else "Weight"
+        record(f"advancedSearch filter {name}", lambda: search(filters={attr: filter}))
+    record("advancedSearch query and filter", lambda: search(query="Species 1", match_type="inclusive", filters={"Weight": ("gte", 100), "color": ("exact", "Red")}))
+    record("advancedSearch cached", lambda: Group.advancedSearch(query="Species 1", match_type="inclusive", filters={"Weight": ("gte", 100), "color": ("exact", "Red")}))
+
+    def coldTree():
+        Group._treeCache.clear()
+        return Group._instances[life].tree
+    record("tree", coldTree)
+    record("tree cached", lambda: Group._instances[life].tree)
+    keys = list(Group._instances)[::max(len(Group._instances) // 1000, 1)]
+    record("completeAttr x1000", lambda: [Group.completeAttr(None, Group._instances[key]) for key in keys])
+
+    def coldView():
+        Group._diagramStale = True
+        return Group.fullTreeView()
+
+    def coldText():
+        Group._fragments.clear()
+        return Group.fullTreeText()
+    record("fullTreeView", coldView, repeat=min(repeat, 3))
+    record("fullTreeText", coldText, repeat=min(repeat, 3))
+    record("fullTreeText cached", Group.fullTreeText)
+
+    kingdom = next(key for key in Group._tree[life] if key in Group._tree)
+    record("delete", lambda: Group.delete(*kingdom), repeat=1)
+    record("delete all", lambda: Group.delete(*life), repeat=1)
+    os.remove(fileName)
+    return results
+
+
+def benchmarkSuite(sizes: list = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6), output: str = "benchmark.json", repeat: int = 5) -> dict:
+    """
+    Runs benchmarkOperations at every size and writes the results, together with the versions they were measured on, to a JSON file, so the results of two releases can be compared.
+
+    - Args:
+        - sizes (list, optional): Numbers of nodes. Defaults to 10^3 to 10^6.
+        - output (str, optional): Path of the JSON file, or None to skip writing it. Defaults to "benchmark.json".
+        - repeat (int, optional): Number of calls of every timed operation. Defaults to 5.
+
+    - Returns:
+        - dict: The written results
+    """
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for nodes in sizes:
+            report["sizes"][str(nodes)] = benchmarkOperations(nodes, directory, repeat)
+            if output is not None:
+                with open(output, "wt") as f:
+                    json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "suite":
+        sizes = [10 ** exponent for exponent in range(3, 7)]
+        if len(sys.argv) > 2:
+            sizes = [size for size in sizes if size <= int(sys.argv[2])]
+        report = benchmarkSuite(sizes, output=sys.argv[3] if len(sys.argv) > 3 else "benchmark.json")
+        for nodes, results in report["sizes"].items():
+            print(nodes, {name: round(value["median"], 6) for name, value in results.items() if isinstance(value, dict)})
+        sys.exit()
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print("delete:", benchmarkDelete(nodes))
+    print("deep delete:", benchmarkDeepDelete(sys.getrecursionlimit() * 2))
+    print("memory:", benchmarkMemory(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000))
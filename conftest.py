@@ -0,0 +1,75 @@
+import math
+import os
+import pytest
+from main import Group
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample.txt")
+
+
+def ownState():
+    """
+    Returns the super group, the own attributes and the brief info of every instance.
+    """
+    return {key: (instance.superSet, dict(instance.attributes.maps[0]), instance._info) for key, instance in Group._instances.items()}
+
+
+def clearTree():
+    for key in [key for key in Group._instances if key[0] == "Life"]:
+        Group.delete(*key)
+    Group.clearSearchCache()
+
+
+def bruteStats(key):
+    """
+    Returns the stats of a group computed from the attributes of every species under it.
+    """
+    species = [key] if key[0] == "Species" else [current for current in Group.descendants(*key) if current[0] == "Species"]
+    values = {}
+    for current in species:
+        for attr, value in Group._instances[current].attributes.items():
+            number = Group._numeric(value)
+            if number is not None:
+                values.setdefault(attr, []).append(number)
+    return len(species), values
+
+
+def assertRollups(keys):
+    for key in keys:
+        stats = Group._instances[key].stats()
+        species, values = bruteStats(key)
+        assert stats["species"] == species, key
+        assert set(stats["attributes"]) == set(values), key
+        for attr, numbers in values.items():
+            found = stats["attributes"][attr]
+            assert (found["count"], found["min"], found["max"]) == (len(numbers), min(numbers), max(numbers)), (key, attr)
+            assert math.isclose(found["sum"], sum(numbers), abs_tol=1e-6), (key, attr)
+
+
+def assertTree():
+    """
+    Checks the Euler-tour ranges, the rollups and the attribute indexes of every group against the tree itself.
+    """
+    for key in list(Group._instances):
+        if key[0] == "Species":
+            continue
+        subTree, stack = [], list(reversed(list(Group._tree[key])))
+        while stack:
+            current = stack.pop()
+            subTree.append(current)
+            stack.extend(reversed(list(Group._tree.get(current, ()))))
+        assert Group.descendants(*key) == subTree, key
+    assertRollups(list(Group._instances))
+    heavy = {key for key, instance in Group._instances.items() if (Group._numeric(instance.attributes.get("Weight")) or 0) >= 100}
+    assert set(Group.advancedSearch(filters={"Weight": ("gte", 100)})) == heavy
+
+
+@pytest.fixture
+def emptyTree():
+    clearTree()
+    yield
+    clearTree()
+
+
+@pytest.fixture
+def sampleTree(emptyTree):
+    Group.readFromFile(SAMPLE)
@@ -1,3 +1,19 @@
+import os
+import sys
+import heapq
+import json
+import zlib
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from collections import ChainMap, OrderedDict
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from types import MappingProxyType
+from array import array
+import numpy as np
 import regex as re
 from treelib import Tree
 from treelib.exceptions import NodeIDAbsentError
@@ -11,12 +27,502 @@ class NoSuchSuperSetException(Exception):
     pass
 
 
+class LoadCancelledException(Exception):
+    pass
+
+
+class SnapshotFormatException(Exception):
+    pass
+
+
+class JournalFormatException(Exception):
+    pass
+
+
+class ReadWriteLock:
+    """
+    A lock that can be held by any number of readers at once, or by a single writer.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class Filter:
+    """
+    A condition on the attributes or the place in the tree of the groups and species searched by advancedSearch. Conditions are combined with & (and), | (or) and ~ (not), e.g. (Filter("Weight", "gt", 100) | Filter("color", "exact", "Blue")) & ~Filter.under("Genus X"), and compiled into a vectorized predicate the first time they are searched.
+    """
+
+    _operators = ("exact", "range", "lt", "lte", "gt", "gte")
+
+    def __init__(self, attr: str, op: str, value) -> None:
+        """
+        Creates a condition on an attribute.
+
+        - Args:
+            - attr (str): Name of the attribute
+            - op (str): One of "exact", "range", "lt" (less than), "lte" (less than or equal to), "gt" (greater than), or "gte" (greater than or equal to)
+            - value: The value to compare against, or a (low, high) tuple for "range"
+        """
+        if op not in self._operators:
+            raise ValueError(
+                f"Invalid filter operator: {op}. Must be 'exact', 'range', 'lt', 'lte', 'gt', or 'gte'.")
+        self._kind = "condition"
+        self._args = (attr, op, value)
+        self._children = ()
+        self._predicate = None
+
+    @classmethod
+    def under(cls, superSet: str | tuple) -> "Filter":
+        """
+        Creates a condition that holds for every group and species under the given group, not including the group itself.
+
+        - Args:
+            - superSet (str | tuple): The group, in any format accepted by the superSet of advancedSearch
+
+        - Returns:
+            - Filter: The condition
+        """
+        return cls._node("under", (superSet,), ())
+
+    @classmethod
+    def fromDict(cls, filters: dict) -> "Filter":
+        """
+        Converts the dictionary form of the filters of advancedSearch into a Filter that ands every condition together. The value of an attribute is an (operator, value) tuple, or a list of them to put several conditions on the same attribute.
+
+        - Args:
+            - filters (dict): The filters
+
+        - Returns:
+            - Filter: The condition
+        """
+        conditions = []
+        for attr, condition in filters.items():
+            if condition and isinstance(condition[0], str):
+                condition = [condition]
+            conditions.extend(cls(attr, op, value) for op, value in condition)
+        return cls._node("and", (), tuple(conditions))
+
+    @classmethod
+    def _node(cls, kind: str, args: tuple, children: tuple) -> "Filter":
+        node = cls.__new__(cls)
+        node._kind = kind
+        node._args = args
+        node._children = children
+        node._predicate = None
+        return node
+
+    def _combine(self, kind: str, other: "Filter") -> "Filter":
+        if not isinstance(other, Filter):
+            return NotImplemented
+        children = []
+        for node in (self, other):
+            children.extend(node._children if node._kind == kind else (node,))
+        return self._node(kind, (), tuple(children))
+
+    def __and__(self, other: "Filter") -> "Filter":
+        return self._combine("and", other)
+
+    def __or__(self, other: "Filter") -> "Filter":
+        return self._combine("or", other)
+
+    def __invert__(self) -> "Filter":
+        return self._children[0] if self._kind == "not" else self._node("not", (), (self,))
+
+    def _key(self) -> tuple:
+        return (self._kind, Group._freeze(self._args), tuple(child._key() for child in self._children))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Filter) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        if self._kind == "condition":
+            return f"Filter{self._args!r}"
+        if self._kind == "under":
+            return f"Filter.under({self._args[0]!r})"
+        if self._kind == "not":
+            return f"~{self._children[0]!r}"
+        return "(" + f" {'&' if self._kind == 'and' else '|'} ".join(map(repr, self._children)) + ")"
+
+
+class Batch:
+    """
+    Buffers inserts, deletes and attribute edits until the enclosing Group.batch block commits them together.
+    """
+
+    def __init__(self) -> None:
+        self._inserts = {}
+        self._deletes = []
+        self._edits = []
+
+    def insert(self, record: tuple) -> None:
+        """
+        Buffers the insertion of a group or species.
+
+        - Args:
+            - record (tuple): A record in the format returned by Group.parseLine
+        """
+        key = (sys.intern(record[0]), record[1])
+        if key in self._inserts:
+            raise GroupAlreadyExistsException
+        self._inserts[key] = (key[0],) + tuple(record[1:])
+
+    def delete(self, type: str, name: str) -> None:
+        """
+        Buffers the deletion of a group and all of its subbranches. Deleting a group inserted earlier in the batch cancels its insertion, the insertion of every group and species buffered under it, and their edits. The edits buffered so far on a group that already exists, or on its subbranches, are dropped when the batch commits.
+
+        - Args:
+            - type (str): Type of the group. e.g. Life, Kingdom, Genus
+            - name (str): Name of the group
+        """
+        key = (type, name)
+        if key not in self._inserts:
+            self._deletes.append((key, len(self._edits)))
+            return
+        children = {}
+        for other, record in self._inserts.items():
+            children.setdefault(record[2], []).append(other)
+        cancelled = {key}
+        stack = [key]
+        while stack:
+            for child in children.get(stack.pop(), ()):
+                if child not in cancelled:
+                    cancelled.add(child)
+                    stack.append(child)
+        for other in cancelled:
+            del self._inserts[other]
+        self._edits = [edit for edit in self._edits if edit[0] not in cancelled]
+
+    def edit(self, type: str, name: str, attr: str, value) -> None:
+        """
+        Buffers setting an attribute of a group or species, the same way as assigning (attr, value) to its info.
+
+        - Args:
+            - type (str): Type of the group. e.g. Life, Kingdom, Genus
+            - name (str): Name of the group
+            - attr (str): Name of the attribute
+            - value: New value of the attribute
+        """
+        self._edits.append(((type, name), attr, value))
+
+
+class Journal:
+    """
+    An append-only log of the changes made to the groups, opened by Group.openJournal. The file starts with a header line holding the checksum of the snapshot it was started from, followed by one JSON array per change. Tuples and dicts in the values are marked, so they are read back as tuples and dicts, and a compaction ends the journal with the checksum of the base snapshot that replaces it.
+    Every line is handed to the operating system as soon as it is written, so it survives a crash of the process, and the file is synced to the disk once every syncRecords lines or syncSeconds seconds, so a crash of the machine loses at most the changes since the last sync.
+    """
+
+    version = 2
+
+    def __init__(self, path: str, base: str, checksum: int, syncRecords: int, syncSeconds: float, compactBytes: int) -> None:
+        self.path = path
+        self.base = base
+        self.checksum = checksum
+        self.syncRecords = syncRecords
+        self.syncSeconds = syncSeconds
+        self.compactBytes = compactBytes
+        self.baseSize = os.path.getsize(base) if base is not None and os.path.exists(base) else 0
+        self._file = open(path, "ab")
+        self.size = self._file.tell()
+        self._unsynced = 0
+        self._lastSync = time.monotonic()
+
+    def append(self, line: bytes) -> None:
+        """
+        Writes a change to the end of the journal, and syncs the file if enough lines or time have gone by since the last sync.
+
+        - Args:
+            - line (bytes): The change, as returned by encode
+        """
+        self._file.write(line)
+        self._file.flush()
+        self.size += len(line)
+        self._unsynced += 1
+        if self._unsynced >= self.syncRecords or time.monotonic() - self._lastSync >= self.syncSeconds:
+            self.sync()
+
+    def sync(self) -> None:
+        """
+        Forces the lines written so far to the disk.
+        """
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._lastSync = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal file.
+        """
+        self.sync()
+        self._file.close()
+
+    @classmethod
+    def encode(cls, operation: str, *args) -> bytes:
+        """
+        Encodes a change as a line of the journal. It raises TypeError for a value that JSON cannot hold, so a change can be encoded before it is made and rejected without changing anything.
+
+        - Args:
+            - operation (str): "insert", "delete", "edit", "batch" or "compacted"
+            - args: The arguments of the change, as passed to _journalAppend
+
+        - Returns:
+            - bytes: The line, with its newline
+        """
+        if operation == "insert":
+            args = ([cls.encodeRecord(record) for record in args[0]],)
+        elif operation == "edit":
+            type, name, attr, value = args
+            args = (type, name, cls.encodeAttr(attr), cls.encodeValue(value))
+        elif operation == "batch":
+            deletes, records, edits = args
+            args = ([list(key) for key in deletes], [cls.encodeRecord(record) for record in records], [[list(key), cls.encodeAttr(attr), cls.encodeValue(value)] for key, attr, value in edits])
+        return json.dumps([operation, *args], separators=(",", ":")).encode("utf-8") + b"\n"
+
+    @classmethod
+    def decode(cls, entry: list) -> list:
+        """
+        Turns a change read from the journal back into the arguments it was encoded from.
+
+        - Args:
+            - entry (list): The change, as read by read
+
+        - Returns:
+            - list: The operation followed by its arguments
+        """
+        operation = entry[0]
+        if operation == "insert":
+            return [operation, [cls.decodeRecord(fields) for fields in entry[1]]]
+        if operation == "edit":
+            return entry[:4] + [cls.decodeValue(entry[4])]
+        if operation == "batch":
+            return [operation, [tuple(key) for key in entry[1]], [cls.decodeRecord(fields) for fields in entry[2]], [(tuple(key), attr, cls.decodeValue(value)) for key, attr, value in entry[3]]]
+        return entry
+
+    @classmethod
+    def encodeRecord(cls, record: tuple) -> list:
+        """
+        Encodes a record in the format returned by Group.parseLine.
+        """
+        type, name, superSet, info, attributes, traits = record
+        return [type, name, None if superSet is None else list(superSet), cls.encodeValue(info),
+                {cls.encodeAttr(attr): cls.encodeValue(value) for attr, value in (attributes or {}).items()},
+                None if traits is None else [cls.encodeValue(trait) for trait in traits]]
+
+    @classmethod
+    def decodeRecord(cls, fields: list) -> tuple:
+        """
+        Turns a record encoded by encodeRecord back into a record.
+        """
+        type, name, superSet, info, attributes, traits = fields
+        return (type, name, None if superSet is None else tuple(superSet), cls.decodeValue(info),
+                {attr: cls.decodeValue(value) for attr, value in attributes.items()},
+                None if traits is None else tuple(cls.decodeValue(trait) for trait in traits))
+
+    @staticmethod
+    def encodeAttr(attr: str) -> str:
+        """
+        Checks that an attribute name can be a JSON key without being turned into a string.
+        """
+        if not isinstance(attr, str):
+            raise TypeError(f"A {type(attr).__name__} attribute name cannot be written to the journal")
+        return attr
+
+    @classmethod
+    def encodeValue(cls, value):
+        """
+        Encodes a value as JSON, with every tuple as {"()": [items]} and every dict as {"{}": {key: item}}, so a plain JSON object never holds a value.
+        """
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+        if isinstance(value, tuple):
+            return {"()": [cls.encodeValue(item) for item in value]}
+        if isinstance(value, list):
+            return [cls.encodeValue(item) for item in value]
+        if isinstance(value, dict):
+            return {"{}": {cls.encodeAttr(key): cls.encodeValue(item) for key, item in value.items()}}
+        raise TypeError(f"A {type(value).__name__} value cannot be written to the journal")
+
+    @classmethod
+    def decodeValue(cls, value):
+        """
+        Turns a value encoded by encodeValue back into the value.
+        """
+        if isinstance(value, list):
+            return [cls.decodeValue(item) for item in value]
+        if isinstance(value, dict):
+            (tag, items), = value.items()
+            if tag == "()":
+                return tuple(cls.decodeValue(item) for item in items)
+            if tag == "{}":
+                return {key: cls.decodeValue(item) for key, item in items.items()}
+            raise ValueError(f"unknown value tag {tag!r}")
+        return value
+
+    @classmethod
+    def create(cls, path: str, checksum: int) -> None:
+        """
+        Replaces the journal file with an empty one started from the snapshot with the given checksum. The new file is written and synced beside the old one and then renamed over it, so a crash leaves either of them whole.
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(json.dumps(["journal", cls.version, checksum], separators=(",", ":")).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+        cls.syncDirectory(path)
+
+    @classmethod
+    def read(cls, path: str) -> tuple:
+        """
+        Reads every change of a journal file. A torn tail left by a crash in the middle of a write, that is bad lines with no good line after them, is cut off the file.
+
+        - Args:
+            - path (str): Path of the journal file
+
+        - Returns:
+            - tuple: The checksum of the snapshot the journal was started from and the list of its changes
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        entries = []
+        good = start = 0
+        torn = None
+        while start < len(data):
+            end = data.find(b"\n", start)
+            try:
+                if end < 0:
+                    raise ValueError("the last line is incomplete")
+                entry = json.loads(data[start:end])
+                if not isinstance(entry, list) or not entry:
+                    raise ValueError("a change must be a non-empty list")
+            except ValueError as error:
+                torn = torn or error
+                start = len(data) if end < 0 else end + 1
+                continue
+            if torn is not None:
+                raise JournalFormatException(f"{path} is corrupt before offset {start}") from torn
+            entries.append(entry)
+            good = start = end + 1
+
+        if not entries or entries[0][:2] != ["journal", cls.version] or len(entries[0]) != 3:
+            raise JournalFormatException(f"{path} is not a version {cls.version} journal")
+        if good < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(good)
+                os.fsync(f.fileno())
+        return entries[0][2], entries[1:]
+
+    @staticmethod
+    def checksum(path: str) -> int:
+        """
+        Returns the CRC-32 of a file, read in blocks of 1 MiB.
+        """
+        checksum = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                checksum = zlib.crc32(block, checksum)
+        return checksum
+
+    @staticmethod
+    def syncDirectory(path: str) -> None:
+        """
+        Syncs the directory of the given file so a rename in it is kept after a crash, on the systems that allow it.
+        """
+        if hasattr(os, "O_DIRECTORY"):
+            descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+
 class Group:
 
-    _treeDiagram = Tree()
-    _treeDiagram.create_node(tag = "Tree Of Life", identifier="0")
+    __slots__ = ("type", "name", "superSet", "_info", "attributes", "_serial")
+
+    _treeDiagram = None
+    _diagramStale = True
     _tree = {}
     _instances = {}
+    _fieldPattern = re.compile(r'(\w+)\s*=\s*(?:"([^"]*)"|\(([^()]*)\)|([^\s,()]+))')
+    _superSetPattern = re.compile(r'\s*"([^"]*)"\s*,\s*"([^"]*)"\s*')
+    _bufferUnsafePattern = re.compile(r'\\[AZzG]|\(\?<?[=!]|\(\?[a-zA-OQ-Z^-]')
+    _nodeKeys = []
+    _deadNodes = 0
+    _nameIndex = {}
+    _typeIndex = {}
+    _gramIndex = {}
+    _gramSize = 3
+    _columns = {}
+    _columnSize = 0
+    _parentIds = np.full(0, -1, dtype=np.int64)
+    _depths = np.full(0, -1, dtype=np.int32)
+    _jumps = np.zeros((1, 0), dtype=np.int64)
+    _typeIds = np.full(0, -1, dtype=np.int32)
+    _nameLengths = np.full(0, -1, dtype=np.int32)
+    _typeCodes = {}
+    _rollups = {}
+    _staleRollups = set()
+    _pendingRollups = []
+    _attrExactIndex = {}
+    _intervals = {None: [0, 1 << 256, 1]}
+    _eulerOrder = []
+    _labelSpacing = 1 << 128
+    _labelFanout = 16
+    _nameBuffer = []
+    _sortedNames = []
+    _bulkDeleteSize = 64
+    _bulkInsertSize = 1024
+    _fragments = {}
+    _fragmentSize = 1 << 12
+    _treeCache = {}
+    _treeVersion = 0
+    _searchCache = OrderedDict()
+    _searchCacheSize = 256
+    _searchCacheLock = threading.Lock()
+    _searchHits = 0
+    _searchMisses = 0
+    _searchVersion = 0
+    _subtreeVersions = {None: 0}
+    _editVersions = {}
+    _lock = ReadWriteLock()
+    _progressLines = 1000
+    _snapshotMagic = b"EOAS"
+    _snapshotVersion = 2
+    _snapshotHeader = struct.Struct("<4sHIIIIIII")
+    _journal = None
 
     def __init__(self, type: str, name: str, superSet: tuple = None, info: str = None, attributes : dict = None) -> None:
         """
@@ -30,41 +536,51 @@ class Group:
             - attributes (dictionary, optional): Main attributes of the group
         """
 
-        if (type, name) in self._tree.keys():
+        if (type, name) in self._instances:
             raise GroupAlreadyExistsException
+        if type != "Life" and superSet not in self._tree:
+            raise NoSuchSuperSetException
+        line = None
+        if self._journal is not None:
+            ownAttributes = dict(attributes) if attributes else {}
+            traits = (ownAttributes.get("Age"), ownAttributes.get("Weight"), ownAttributes.get("Size")) if type == "Species" else None
+            line = Journal.encode("insert", [(type, name, superSet if type != "Life" else None, info, ownAttributes, traits)])
         if type != "Life":
-            if superSet == None:
-                raise NoSuchSuperSetException
-            try:
-                self._tree[superSet].append((type, name))
-            except KeyError:
-                raise NoSuchSuperSetException
-        self._tree.update({(type, name): []})
+            self._tree[superSet][(type, name)] = None
+        self._tree.update({(type, name): {}})
+        type = sys.intern(type)
         self.type = type
         self.name = name
-        self.superSet = superSet
+        self.superSet = superSet if type != "Life" else None
         self._info = info
-        self.attributes = attributes
-        self.attributes = self.completeAttr(self)
+        self.attributes = self._layerAttributes(self.superSet, attributes)
         self._instances.update({(type, name): self})
-        if type == "Life":
-            Group._treeDiagram.create_node(
-                tag=f"{self.name} ({self.type})", identifier=f"{self.type} {self.name}", parent="0")
-        else:
-            Group._treeDiagram.create_node(
-                tag=f"{self.name} ({self.type})", identifier=f"{self.type} {self.name}", parent=f"{superSet[0]} {superSet[1]}")
-
-    def completeAttr(self, start):
-        def subfunc(start: Group) -> dict:
-            attr = {}
-            if start.superSet != None:
-                upperAttr = subfunc(self._instances[start.superSet])
-                if upperAttr:
-                    attr.update(upperAttr)
-            if start.attributes:
-                attr.update(start.attributes)
-            return attr
-        return subfunc(start)
+        self._register(self)
+        self._addToDiagram((type, name), self.superSet)
+        self._journalAppend(line)
+
+    @classmethod
+    def _layerAttributes(cls, superSet: tuple, attributes: dict) -> ChainMap:
+        """
+        Stacks a copy of the given attributes as a new layer on top of the attributes of the super group. Reads resolve through the chain of ancestors, so an edit to an ancestor is seen by every descendant without copying any dicts.
+
+        - Args:
+            - superSet (tuple): The (type, name) of the super group, or None for the top of the tree
+            - attributes (dict): The group's own attributes
+
+        - Returns:
+            - ChainMap: The attributes of the group, including the inherited ones
+        """
+        ownAttributes = dict(attributes) if attributes else {}
+        if superSet is None:
+            return ChainMap(ownAttributes)
+        return cls._instances[superSet].attributes.new_child(ownAttributes)
+
+    def completeAttr(self, start) -> dict:
+        """
+        Returns every attribute of the given instance, including the inherited ones, as a single dict.
+        """
+        return dict(start.attributes)
 
     @property
     def info(self) -> str:
@@ -85,172 +601,1765 @@ class Group:
 
     @info.setter
     def info(self, newData : tuple):
-        def changeSubBranch(branch: Group | Species):
-            if self.type != "Species":
-                for branch in self._tree[(branch.type, branch.name)]:
-                    changeSubBranch(self._instances[branch])
-            branch.attributes.update({newData[0]: newData[1]})
+        attr, value = newData
+        line = Journal.encode("edit", self.type, self.name, attr, value) if self._journal is not None else None
+        old = self.attributes.get(attr)
+        affected = self._writeAttribute(self, attr, value)
+        self._shiftRollups(self, attr, old, value, affected)
+        self._journalAppend(line)
+
+    @classmethod
+    def _writeAttribute(cls, instance, attr: str, value, keep: bool = True) -> list:
+        """
+        Sets an own attribute of the instance, or removes it when keep is False, and reindexes the instance and every subbranch that inherits it. The rollups are left to the caller.
+
+        - Returns:
+            - list: The instance and every subbranch that inherits the attribute from it, in pre-order
+        """
+        affected = []
+        stack = [instance]
+        while stack:
+            branch = stack.pop()
+            if branch is not instance and attr in branch.attributes.maps[0]:
+                continue  # the subbranch overrides the attribute, so it and its own subbranches keep their value
+            affected.append(branch)
+            if branch.type != "Species":
+                stack.extend(cls._instances[subBranch] for subBranch in cls._tree[(branch.type, branch.name)])
+        for branch in affected:
+            cls._unindexAttribute(branch, attr)
+        if keep:
+            instance.attributes.maps[0][attr] = value
+        else:
+            instance.attributes.maps[0].pop(attr, None)
+        for branch in affected:
+            cls._indexAttribute(branch, attr)
+        if instance.type == "Species":
+            cls._touchSearch(instance.superSet)
+        else:
+            cls._touchSearch((instance.type, instance.name), edited=True)
+        return affected
+
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """
+        Buffers the inserts, deletes and attribute edits made through the yielded Batch and applies them together when the block ends: first the deletes, then the inserts with a single bulkLoad, then the edits, with the rollups of the edited groups rebuilt once.
+        Everything is validated before anything is applied. If the block raises nothing is applied, and if applying fails the changes made so far are undone, so the tree is left as it was before the block.
+
+        - Yields:
+            - Batch: The buffer of the changes
+        """
+        batch = Batch()
+        yield batch
+        cls._commitBatch(batch)
+
+    @classmethod
+    def _commitBatch(cls, batch: Batch) -> None:
+        """
+        Validates and applies the changes buffered in a batch, undoing the applied ones if any of them fails.
+        """
+        removed = {}  # the number of edits buffered before the delete that removes each key
+        deleteRoots = []
+        for key, editCount in batch._deletes:
+            if key in removed:
+                continue
+            if key not in cls._instances:
+                raise KeyError(key)
+            subTree = set(cls.descendants(*key))
+            for current in subTree:
+                removed.setdefault(current, editCount)
+            removed[key] = editCount
+            deleteRoots = [root for root in deleteRoots if root not in subTree]
+            deleteRoots.append(key)
+
+        records = dict(batch._inserts)
+        for key, record in records.items():
+            if key in cls._instances and key not in removed:
+                raise GroupAlreadyExistsException
+            superSet = record[2]
+            if key[0] != "Life" and superSet not in records and (superSet not in cls._tree or superSet in removed):
+                raise NoSuchSuperSetException
+        edits = []
+        for position, (key, attr, value) in enumerate(batch._edits):
+            if removed.get(key, 0) > position:
+                continue  # made before the key was deleted
+            if key in records:
+                record = records[key]
+                records[key] = record[:4] + ({**record[4], attr: value},) + record[5:]
+            elif key in cls._instances and key not in removed:
+                edits.append((key, attr, value))
+            else:
+                raise KeyError(key)
+
+        line = None
+        if cls._journal is not None and (deleteRoots or records or edits):
+            line = Journal.encode("batch", deleteRoots, list(records.values()), edits)
+        deleted = []
+        inserted = []
+        written = []
+        rolled = []
+        oldRollups = {}
+        try:
+            for root in deleteRoots:
+                deleted.append(cls._subTreeRecords(root))
+                cls._delete(*root)
+            inserted = [key for key, record in records.items() if key[0] == "Life" or record[2] not in records]
+            if records:
+                cls._bulkLoad(records.values())
+
+            edited = {key for key, attr, value in edits}
+            for key in edited:
+                superSet = cls._instances[key].superSet
+                while superSet is not None and superSet not in edited:
+                    superSet = cls._instances[superSet].superSet
+                if superSet is None:
+                    oldRollups[key] = cls._rollupOf(key)  # only the topmost edited groups need their rollups rebuilt
+            for key, attr, value in edits:
+                instance = cls._instances[key]
+                layer = instance.attributes.maps[0]
+                written.append((instance, attr, layer.get(attr), attr in layer))
+                cls._writeAttribute(instance, attr, value)
+            for key, oldRollup in oldRollups.items():
+                cls._rebuildRollups(key)
+                superSet = cls._instances[key].superSet
+                if superSet is not None:
+                    newRollup = cls._rollupOf(key)
+                    cls._applyRollup(superSet, oldRollup, -1)
+                    cls._applyRollup(superSet, newRollup, 1)
+                    rolled.append((superSet, oldRollup, newRollup))
+        except BaseException:
+            for instance, attr, value, present in reversed(written):
+                cls._writeAttribute(instance, attr, value, keep=present)
+            for key in oldRollups:
+                cls._rebuildRollups(key)
+            for superSet, oldRollup, newRollup in reversed(rolled):
+                cls._applyRollup(superSet, newRollup, -1)
+                cls._applyRollup(superSet, oldRollup, 1)
+            for key in inserted:
+                if key in cls._instances:  # a failed bulkLoad takes back its own instances
+                    cls._delete(*key)
+            for subTreeRecords in reversed(deleted):
+                cls._bulkLoad(subTreeRecords)
+            raise
+        cls._journalAppend(line)
+
+    @classmethod
+    def _subTreeRecords(cls, key: tuple) -> list:
+        """
+        Returns the records of the given group and of every group and species under it in pre-order, in the format returned by parseLine, so that bulkLoad can put the subtree back.
+        The traits of a species are also left in its attributes, which bulkLoad layers over the parsed traits, so their values are restored unchanged.
+        """
+        return [cls._recordOf(current) for current in [key] + cls.descendants(*key)]
+
+    @classmethod
+    def _recordOf(cls, key: tuple) -> tuple:
+        """
+        Returns the record of a group or species with its own attributes, in the format returned by parseLine, with the traits of a species also left in its attributes.
+        """
+        instance = cls._instances[key]
+        attributes = dict(instance.attributes.maps[0])
+        traits = None
+        if instance.type == "Species":
+            traits = (attributes.get("Age"), attributes.get("Weight"), attributes.get("Size"))
+        return (instance.type, instance.name, instance.superSet, instance._info, attributes, traits)
+
+    @classmethod
+    def delete(cls, type: str, name: str) -> None:
+        """
+        Deletes the given group and all of its subbranches. The subbranches are read as one contiguous range of the Euler tour and removed without recursion, and the tree diagram drops the whole branch in a single call.
+
+        - Args:
+            - type (str): Type of the group. e.g. Life, Kingdom, Genus
+            - name (str): Name of the group
+
+        - Returns:
+            - int: The number of deleted groups and species
+        """
+        line = Journal.encode("delete", type, name) if cls._journal is not None else None
+        removed = cls._delete(type, name)
+        cls._journalAppend(line)
+        return removed
+
+    @classmethod
+    def _delete(cls, type: str, name: str) -> int:
+        """
+        Deletes the given group and all of its subbranches without writing to the journal.
+        """
+        if not cls._diagramStale:
+            try:
+                cls._treeDiagram.remove_node(f"{type} {name}")
+            except NodeIDAbsentError:
+                pass
+        superSet = cls._instances[(type, name)].superSet
+        if type != "Life":
+            del cls._tree[superSet][(type, name)]
+        removedRollup = cls._rollupOf((type, name))
+
+        enter, exit, _ = cls._intervals[(type, name)]
+        first = bisect_left(cls._eulerOrder, (enter,))
+        last = bisect_left(cls._eulerOrder, (exit,))
+        removed = [entry[1] for entry in cls._eulerOrder[first:last]]
+        del cls._eulerOrder[first:last]
+        if len(removed) > cls._bulkDeleteSize:
+            cls._sortedNames.clear()  # rebuilt on the next suggest instead of removing the names one by one
+        # the attributes of every removed node are its super group's plus its own layer, carried down the pre-order range instead of flattening each ChainMap
+        attributes = {}
+        for key in removed:
+            instance = cls._instances.pop(key)
+            inherited = attributes.get(instance.superSet)
+            if inherited is None:
+                attributes[key] = dict(instance.attributes)
+            elif instance.attributes.maps[0]:
+                attributes[key] = {**inherited, **instance.attributes.maps[0]}
+            else:
+                attributes[key] = inherited
+            cls._unregister(instance, attributes[key])
+            cls._tree.pop(key, None)
+            cls._fragments.pop(key, None)
+            cls._treeCache.pop(key, None)
+            cls._rollups.pop(key, None)
+            cls._staleRollups.discard(key)
+            cls._subtreeVersions.pop(key, None)
+            cls._editVersions.pop(key, None)
+        cls._invalidateFragments(superSet)
+        cls._touchSearch(superSet)
+        if superSet is not None:
+            cls._applyRollup(superSet, removedRollup, -1)
+        return len(removed)
+
+    @property
+    def tree(self) -> MappingProxyType:
+        """
+        Returns the tree starting from the instance group. The view is built once in O(subtree size) and cached until a group or species is added to or deleted from the subtree.
+
+        - Returns:
+            - MappingProxyType: A read-only dictionary containing every sub-group which is a subbranch of the group keyed by their supers, in pre-order, with their subbranches as tuples.
+        """
+        key = (self.type, self.name)
+        view = self._treeCache.get(key)
+        if view is None:
+            view = self._treeCache[key] = MappingProxyType(dict(self.iterTree()))
+        return view
+
+    def iterTree(self):
+        """
+        Streams the tree starting from the instance group in pre-order, without building the whole dictionary.
+
+        - Yields:
+            - tuple: (group, subbranches) for the group and every sub-group under it, where subbranches is a tuple of (type, name) keys. For a species only (species, None) is yielded.
+        """
+        if self.type == "Species":
+            yield (self.type, self.name), None
+            return
+        stack = [(self.type, self.name)]
+        while stack:
+            current = stack.pop()
+            subBranches = tuple(self._tree[current])
+            yield current, subBranches
+            stack.extend(subBranch for subBranch in reversed(subBranches) if subBranch in self._tree)
+
+    @classmethod
+    def fullTreeView(cls) -> Tree:
+        """
+        Returns the full tree view
+
+        - Returns:
+            - Tree: an instance of he Tree class
+        """
+        cls._ensureDiagram()
+        return cls._treeDiagram
+
+    @property
+    def subTreeView(self) -> Tree:
+        """
+        Returns the tree view from the instance group
+
+        - Returns:
+            - Tree: an instance of he Tree class
+        """
+        self._ensureDiagram()
+        return self._treeDiagram.subtree(f"{self.type} {self.name}")
+
+    @classmethod
+    def _addToDiagram(cls, key: tuple, superSet: tuple) -> None:
+        """
+        Adds a node to the tree diagram, unless the diagram is stale and will be rebuilt from _tree on its next use.
+
+        - Args:
+            - key (tuple): The (type, name) of the new group or species
+            - superSet (tuple): The (type, name) of its super group, or None for a Life
+        """
+        if cls._diagramStale:
+            return
+        parent = "0" if superSet is None else f"{superSet[0]} {superSet[1]}"
+        cls._treeDiagram.create_node(tag=f"{key[1]} ({key[0]})", identifier=f"{key[0]} {key[1]}", parent=parent)
+
+    @classmethod
+    def _ensureDiagram(cls) -> None:
+        """
+        Rebuilds the tree diagram from _tree in breadth-first order if it is stale. It is only built on its first use, and is marked stale again by loadSnapshot.
+        """
+        if not cls._diagramStale:
+            return
+        diagram = Tree()
+        diagram.create_node(tag="Tree Of Life", identifier="0")
+        order = [(key, None) for key in cls._instances if key[0] == "Life"]
+        for key, superSet in order:
+            parent = "0" if superSet is None else f"{superSet[0]} {superSet[1]}"
+            diagram.create_node(tag=f"{key[1]} ({key[0]})", identifier=f"{key[0]} {key[1]}", parent=parent)
+            order.extend((subBranch, key) for subBranch in cls._tree.get(key, ()))
+        Group._treeDiagram = diagram
+        Group._diagramStale = False
+
+    @classmethod
+    def fullTreeText(cls) -> str:
+        """
+        Returns the full tree view rendered as text, the same as str(fullTreeView()). The text of the small subtrees and of the whole tree is cached, so after a change only the small subtree holding it is rendered again before the whole text is joined.
+
+        - Returns:
+            - str: The rendered tree
+        """
+        return cls._renderFragment(None) + "\n"
+
+    @property
+    def subTreeText(self) -> str:
+        """
+        Returns the tree view from the instance group rendered as text, the same as str(subTreeView), reusing the cached text of the subtrees.
+
+        - Returns:
+            - str: The rendered tree
+        """
+        return self._renderFragment((self.type, self.name)) + "\n"
+
+    @classmethod
+    def _renderFragment(cls, key: tuple) -> str:
+        """
+        Renders the subtree of the given group the same way as the tree diagram, with the subbranches sorted by their tags.
+        Only the largest subtrees whose text fits in fragmentSize characters are cached, and the text of the subtrees inside them is dropped, so the cached texts never overlap and take as much memory as the tree text itself. The larger groups are then joined in one pass that adds the prefix of every line once. The text of the whole tree is also cached.
+
+        - Args:
+            - key (tuple): The (type, name) of the group, or None for the whole tree
+
+        - Returns:
+            - str: The rendered lines without a trailing newline
+        """
+        if key in cls._fragments:
+            return cls._fragments[key]
+
+        def subBranchesOf(current: tuple) -> list:
+            subBranches = cls._typeIndex.get("Life", ()) if current is None else cls._tree.get(current, ())
+            return sorted(subBranches, key=lambda subBranch: f"{subBranch[1]} ({subBranch[0]})")
+
+        fragments = cls._fragments
+        superSet = None if key is None else cls._instances[key].superSet
+        while superSet is not None:
+            if superSet in fragments:
+                fragments = {}  # the group is inside a cached subtree, whose text is not split up
+                break
+            superSet = cls._instances[superSet].superSet
+
+        large = set()
+        stack = [key]
+        while stack:
+            current = stack[-1]
+            if current in fragments or current in large:
+                stack.pop()
+                continue
+            subBranches = subBranchesOf(current)
+            missing = [subBranch for subBranch in subBranches if subBranch not in fragments and subBranch not in large]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if any(subBranch in large for subBranch in subBranches):
+                large.add(current)
+                continue
+            parts = ["Tree Of Life" if current is None else f"{current[1]} ({current[0]})"]
+            for subBranch in subBranches[:-1]:
+                parts.append("├── " + fragments[subBranch].replace("\n", "\n│   "))
+            if subBranches:
+                parts.append("└── " + fragments[subBranches[-1]].replace("\n", "\n    "))
+            text = "\n".join(parts)
+            if len(text) > cls._fragmentSize:
+                large.add(current)
+                continue
+            fragments[current] = text
+            for subBranch in subBranches:
+                del fragments[subBranch]
+        if key in fragments:
+            return fragments[key]
+
+        lines = []
+        stack = [(key, "", "")]
+        while stack:
+            current, first, rest = stack.pop()
+            text = fragments.get(current)
+            if text is not None:
+                lines.append(first + (text.replace("\n", "\n" + rest) if rest else text))
+                continue
+            lines.append(first + ("Tree Of Life" if current is None else f"{current[1]} ({current[0]})"))
+            subBranches = subBranchesOf(current)
+            if subBranches:
+                stack.append((subBranches[-1], rest + "└── ", rest + "    "))
+                stack.extend((subBranch, rest + "├── ", rest + "│   ") for subBranch in reversed(subBranches[:-1]))
+        text = "\n".join(lines)
+        if key is None:
+            cls._fragments[None] = text
+        return text
+
+    @classmethod
+    def _invalidateFragments(cls, key: tuple) -> None:
+        """
+        Drops the cached text and the cached tree view of the given group and of every group above it, and bumps the tree version.
+
+        - Args:
+            - key (tuple): The (type, name) of the group, or None for the top of the tree
+        """
+        Group._treeVersion += 1
+        if cls._treeCache:
+            superSet = key
+            while superSet in cls._instances:  # during bulkLoad the super group may not be registered yet
+                cls._treeCache.pop(superSet, None)
+                superSet = cls._instances[superSet].superSet
+        cls._fragments.pop(None, None)
+        while key in cls._instances:  # only one group above a change holds its cached text, but it may be any of them
+            cls._fragments.pop(key, None)
+            key = cls._instances[key].superSet
+
+
+    @classmethod
+    def advancedSearch(cls, superSet: str = "", query: str = "", match_type: str = "", filters: dict = None, batched: bool = False, order_by: str = None, limit: int = None, offset: int = 0) -> dict:
+        """
+        Searches for instances that match the given query and filters, optionally restricted to a specific superSet.
+
+        - Args:
+            - superSet (str | tuple, optional): The group to search within, either as a (type, name) tuple, as "type name", or by its name. Every group or species under it is searched, not only its direct subbranches. Defaults to "" (search the whole tree).
+            - query (str, optional): The search query. Defaults to None (search all types and names).
+            - match_type (str, optional): The match type to use for the query. Can be "inclusive" (default), "exact", or "regular expression".
+            - filters (dict, optional): A dictionary of filters to apply. Each key should be an attribute name, and each value should be a tuple of (operator, value), where operator is one of "exact", "range", "lt" (less than), "lte" (less than or equal to), "gt" (greater than), or "gte" (greater than or equal to), and value is the value to compare against. Defaults to None (no filters applied).
+            - batched (bool, optional): Matches a regular expression against one newline-joined buffer of all the names instead of name by name. Defaults to False.
+            - order_by (str, optional): The attribute to order the results by, with a leading "-" for descending order, as in iterSearch. Defaults to None (the order in which the instances were created).
+            - limit (int, optional): The maximum number of results. Defaults to None (every result).
+            - offset (int, optional): The number of results to skip. Defaults to 0.
+
+        - Returns:
+            - dict: A dictionary containing the matching instances, keyed by their (type, name) tuples.
+        """
+        if order_by is not None or limit is not None or offset:
+            return dict(cls.iterSearch(superSet, query, match_type, filters, batched, order_by, limit, offset))
+        entry = cls._searchEntry(superSet, query, match_type, filters, batched)
+        if entry[2] is None:
+            nodeKeys, instances = cls._nodeKeys, cls._instances
+            entry[2] = {nodeKeys[serial]: instances[nodeKeys[serial]] for serial in entry[1].tolist()}
+        return dict(entry[2])
+
+    @classmethod
+    def iterSearch(cls, superSet: str = "", query: str = "", match_type: str = "", filters: dict = None, batched: bool = False, order_by: str = None, limit: int = None, offset: int = 0):
+        """
+        Searches the same way as advancedSearch, but returns the results as a lazy iterator, in pages that are only selected and ordered as they are reached. The first page of k results costs a linear-time selection and a sort of k results, not a sort of every match.
+        With order_by, the numbers come first, in ascending or descending order, then the text values that are not numbers, by their lowercase text, then the instances without the attribute or with a value of another type. Ties keep the order in which the instances were created. The tree should not change while the iterator is used.
+
+        - Args:
+            - superSet, query, match_type, filters, batched: As in advancedSearch
+            - order_by (str, optional): The attribute to order the results by, with a leading "-" for descending order, e.g. "-Weight". Defaults to None (the order in which the instances were created).
+            - limit (int, optional): The maximum number of results. Defaults to None (every result).
+            - offset (int, optional): The number of results to skip. Defaults to 0.
+
+        - Returns:
+            - iterator: The ((type, name), instance) pairs of the results
+        """
+        ids = cls._searchEntry(superSet, query, match_type, filters, batched)[1]
+        return cls._iterOrdered(ids, order_by, limit, offset)
+
+    @classmethod
+    def _searchEntry(cls, superSet: str | tuple, query: str, match_type: str, filters: dict, batched: bool) -> list:
+        """
+        Returns the search result cache entry of the given arguments of advancedSearch, searching first if there is no valid one.
+
+        - Returns:
+            - list: [version, ids, matches], where ids is a read-only sorted array of the ids of the matching instances and matches their dictionary once advancedSearch has built it
+        """
+        scopes = cls._resolveScopes(superSet) if superSet else None
+        try:
+            cacheKey = (scopes, query, match_type if query != "" else "", batched and match_type == "regular expression", cls._freeze(filters or {}))
+            hash(cacheKey)
+        except TypeError:
+            cacheKey = None  # a filter value that cannot be hashed, which is searched without the cache
+        with cls._searchCacheLock:  # readers may search at the same time under the read lock
+            cached = cls._searchCache.get(cacheKey) if cacheKey is not None else None
+            if cached is not None and cls._searchCacheValid(scopes, cached[0]):
+                cls._searchCache.move_to_end(cacheKey)
+                Group._searchHits += 1
+                return cached
+            Group._searchMisses += 1
+        version = cls._searchVersion
+
+        candidates = cls._queryCandidates(query, match_type, batched) if query != "" else None
+        if filters:
+            candidates = cls._filterCandidates(filters, candidates)
+        if scopes is not None:
+            candidates = cls._scopeCandidates(scopes, candidates)
+        if candidates is None:
+            ids = np.flatnonzero(cls._typeIds[:len(cls._nodeKeys)] >= 0)
+        else:
+            ids = np.sort(np.fromiter((cls._instances[key]._serial for key in candidates), dtype=np.int64, count=len(candidates)))
+        ids.flags.writeable = False
+        entry = [version, ids, None]
+
+        if cacheKey is not None:
+            with cls._searchCacheLock:
+                cls._searchCache[cacheKey] = entry
+                cls._searchCache.move_to_end(cacheKey)
+                if len(cls._searchCache) > cls._searchCacheSize:
+                    cls._searchCache.popitem(last=False)
+        return entry
+
+    @classmethod
+    def _iterOrdered(cls, ids: np.ndarray, order_by: str, limit: int, offset: int):
+        """
+        Yields the instances of the given sorted ids in the order of iterSearch, from the offset up to the limit. The numbers are selected in pages that double in size, and the text values are read from the exact match index one distinct value at a time in sorted order.
+        """
+        nodeKeys, instances = cls._nodeKeys, cls._instances
+        stop = len(ids) if limit is None else min(offset + limit, len(ids))
+        if order_by is None:
+            for serial in ids[offset:stop].tolist():
+                yield nodeKeys[serial], instances[nodeKeys[serial]]
+            return
+
+        descending = order_by.startswith("-")
+        attr = order_by[1:] if descending else order_by
+        column = cls._columns.get(attr)
+        values = column[ids] if column is not None else np.full(len(ids), np.nan)
+        numeric = ~np.isnan(values)
+        numericIds, rest = ids[numeric], ids[~numeric]
+        keys = -values[numeric] if descending else values[numeric]
+        position, page = offset, max(limit or 0, 64)
+        while position < min(stop, len(numericIds)):
+            end = min(stop, len(numericIds), position + page)
+            for serial in cls._selectOrdered(numericIds, keys, position, end).tolist():
+                yield nodeKeys[serial], instances[nodeKeys[serial]]
+            position, page = end, page * 2
+
+        position, stop = position - len(numericIds), stop - len(numericIds)
+        if stop <= 0 or not len(rest):
+            return
+        remaining = np.zeros(len(nodeKeys), dtype=bool)
+        remaining[rest] = True
+        texts = cls._attrExactIndex.get(attr, {})
+        for text in sorted(texts, reverse=descending):
+            serials = np.sort(np.fromiter((instances[key]._serial for key in texts[text]), dtype=np.int64, count=len(texts[text])))
+            serials = serials[remaining[serials]]
+            remaining[serials] = False
+            for serial in serials[max(position, 0):stop].tolist():
+                yield nodeKeys[serial], instances[nodeKeys[serial]]
+            position, stop = position - len(serials), stop - len(serials)
+            if stop <= 0:
+                return
+        for serial in np.flatnonzero(remaining)[max(position, 0):stop].tolist():
+            yield nodeKeys[serial], instances[nodeKeys[serial]]
+
+    @staticmethod
+    def _selectOrdered(ids: np.ndarray, keys: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """
+        Returns the ids at the positions start to stop of the ids sorted by their keys, with ties in the order of the ids. Only the first stop ids are sorted, after a linear-time partition around the key at stop.
+        """
+        if stop >= len(keys):
+            chosen = np.arange(len(keys))
+        else:
+            kth = np.partition(keys, stop - 1)[stop - 1]
+            chosen = np.flatnonzero(keys < kth)
+            ties = np.flatnonzero(keys == kth)[:stop - len(chosen)]
+            chosen = np.sort(np.concatenate((chosen, ties)))
+        order = chosen[np.argsort(keys[chosen], kind="stable")]
+        return ids[order[start:stop]]
+
+    @classmethod
+    def searchCacheInfo(cls) -> dict:
+        """
+        Returns the counters of the advancedSearch result cache.
+
+        - Returns:
+            - dict: The number of hits and misses, the number of cached results and the maximum number of cached results
+        """
+        return {"hits": cls._searchHits, "misses": cls._searchMisses, "size": len(cls._searchCache), "maxSize": cls._searchCacheSize}
+
+    @classmethod
+    def clearSearchCache(cls) -> None:
+        """
+        Drops every cached advancedSearch result and resets the counters.
+        """
+        with cls._searchCacheLock:
+            cls._searchCache.clear()
+            Group._searchHits = Group._searchMisses = 0
+
+    @classmethod
+    def _searchCacheValid(cls, scopes: tuple, version: int) -> bool:
+        """
+        Checks whether a cached advancedSearch result computed at the given version is still valid. A search of the whole tree is stale after any change, and a search of some groups only after a change inside them or an attribute edit on one of their ancestors.
+        """
+        if scopes is None:
+            return cls._subtreeVersions[None] <= version
+        for scope in scopes:
+            if cls._subtreeVersions.get(scope, version + 1) > version:
+                return False
+            while scope is not None:
+                if cls._editVersions.get(scope, 0) > version:
+                    return False
+                scope = cls._instances[scope].superSet
+        return True
+
+    @classmethod
+    def _touchSearch(cls, key: tuple, edited: bool = False) -> None:
+        """
+        Bumps the search version and stamps it on the given group and every group above it, which stales the cached advancedSearch results of those groups. An edit is also stamped as such on the group, which stales the cached results of the groups under it.
+
+        - Args:
+            - key (tuple): The (type, name) of the group, or None for the top of the tree
+            - edited (bool, optional): The attributes of the group were edited. Defaults to False.
+        """
+        Group._searchVersion += 1
+        version = cls._searchVersion
+        if edited:
+            cls._editVersions[key] = version
+        while key is not None:
+            cls._subtreeVersions[key] = version
+            key = cls._instances[key].superSet
+        cls._subtreeVersions[None] = version
+
+    @staticmethod
+    def _freeze(value):
+        """
+        Turns the filters of advancedSearch into a hashable cache key, with the attributes in a fixed order. Every other value is kept with its type, since equal values of different types, such as True and 1, do not match the same instances.
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((attr, Group._freeze(item)) for attr, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(Group._freeze(item) for item in value)
+        return (type(value), value)  # a Filter is hashable by its structure
+
+    @classmethod
+    def _queryCandidates(cls, query: str, match_type: str, batched: bool = False) -> set:
+        """
+        Looks the query up in the search indexes.
+
+        - Args:
+            - query (str): The search query
+            - match_type (str): "inclusive", "exact", or "regular expression"
+            - batched (bool, optional): Matches a regular expression against the buffer of all the names. Defaults to False.
+
+        - Returns:
+            - set: The keys of the instances whose type or name match the query
+        """
+        if match_type == "exact":
+            return cls._typeIndex.get(query, set()).union(cls._nameIndex.get(query, ()))
+        elif match_type == "inclusive":
+            query = query.lower()
+            if len(query) <= cls._gramSize:
+                candidates = set(map(cls._nodeKeys.__getitem__, cls._gramIndex.get(query, ())))
+                candidates.discard(None)
+            else:
+                postings = min((cls._gramIndex.get(gram, ()) for gram in cls._grams(query, cls._gramSize)), key=len)
+                candidates = {key for key in map(cls._nodeKeys.__getitem__, postings) if key is not None and query in key[1].lower()}
+            for type, keys in cls._typeIndex.items():
+                if query in type.lower():
+                    candidates |= keys
+            return candidates
+        elif match_type == "regular expression":
+            try:
+                pattern = cls._compilePattern(query)
+            except re.error as e:
+                print(f"Regular expression error: {e}")
+                return set()
+            candidates = set()
+            for type, keys in cls._typeIndex.items():
+                if pattern.fullmatch(type):
+                    candidates |= keys
+            names = cls._batchedMatches(query) if batched else None
+            if names is None:
+                names = (name for name in cls._nameIndex if pattern.fullmatch(name))
+            for name in names:
+                candidates.update(cls._nameIndex[name])
+            return candidates
+        elif match_type == "fuzzy":
+            candidates = set()
+            types = list(cls._typeIndex)
+            if types:
+                distances = cls._editDistances(query.lower(), [type.lower() for type in types])
+                for type, found in zip(types, distances.tolist()):
+                    if found <= cls._fuzzyDistance(query):
+                        candidates |= cls._typeIndex[type]
+            for name, distance in cls.fuzzySearch(query, limit=None):
+                candidates.update(cls._nameIndex[name])
+            return candidates
+        raise ValueError(
+            f"Invalid match_type: {match_type}. Must be 'inclusive', 'exact', 'regular expression', or 'fuzzy'.")
+
+    @classmethod
+    def suggest(cls, prefix: str, limit: int = 10) -> list:
+        """
+        Returns the names that start with the given prefix, ignoring case, in alphabetical order. They are read from a sorted array of the names by binary search, which is kept up to date on single inserts and deletes and rebuilt after bulk changes.
+
+        - Args:
+            - prefix (str): The start of the name
+            - limit (int, optional): The maximum number of names. Defaults to 10.
+
+        - Returns:
+            - list: The matching names
+        """
+        if not cls._sortedNames and cls._nameIndex:
+            cls._sortedNames.extend(sorted(cls._nameIndex, key=str.lower))
+        names = cls._sortedNames
+        prefix = prefix.lower()
+        position = bisect_left(names, prefix, key=str.lower)
+        matches = []
+        while position < len(names) and len(matches) < limit and names[position].lower().startswith(prefix):
+            matches.append(names[position])
+            position += 1
+        return matches
+
+    @classmethod
+    def fuzzySearch(cls, query: str, limit: int = 10, maxDistance: int = None) -> list:
+        """
+        Finds the names within a bounded edit distance of the query, ignoring case, ranked by distance, then by the difference in length and then alphabetically.
+        Candidates are the names of about the same length that share enough n-grams with the query: every edit removes at most n of the n-grams of the query, so a name within distance d shares at least all but n * d of them. The shared n-grams are counted with NumPy over the posting arrays, and the edit distances of all the candidates are computed at once.
+
+        - Args:
+            - query (str): The misspelled name
+            - limit (int, optional): The maximum number of names, or None for every name within the distance. Defaults to 10.
+            - maxDistance (int, optional): The largest edit distance. Defaults to 0 for queries of up to 2 characters, 1 for up to 5 characters and 2 for longer ones. It is lowered for short queries so that a match always shares at least one n-gram with the query.
+
+        - Returns:
+            - list: (name, distance) tuples
+        """
+        query = query.lower()
+        distance = cls._fuzzyDistance(query) if maxDistance is None else maxDistance
+        grams = set()
+        while distance >= 0 and not grams:
+            for size in range(cls._gramSize, 0, -1):
+                grams = cls._grams(query, size)
+                if len(grams) - size * distance >= 1:
+                    break
+                grams = set()
+            else:
+                distance -= 1
+        if not grams:
+            return []
+        threshold = len(grams) - size * distance
+        postings = [cls._gramIndex[gram] for gram in grams if gram in cls._gramIndex]
+        if len(postings) < threshold:
+            return []
+        ids = np.concatenate([np.frombuffer(posting, dtype=np.uint32) for posting in postings]).astype(np.int64)
+        if len(ids) * 8 < len(cls._nodeKeys):
+            ids, shared = np.unique(ids, return_counts=True)
+            ids = ids[shared >= threshold]
+        else:
+            ids = np.flatnonzero(np.bincount(ids) >= threshold)
+        ids = ids[np.abs(cls._nameLengths[ids] - len(query)) <= distance]
+
+        names = list(dict.fromkeys(cls._nodeKeys[serial][1] for serial in ids.tolist() if cls._nodeKeys[serial] is not None))
+        if not names:
+            return []
+        distances = cls._editDistances(query, [name.lower() for name in names]).tolist()
+        matches = ((found, abs(len(name) - len(query)), name.lower(), name) for name, found in zip(names, distances) if found <= distance)
+        matches = sorted(matches) if limit is None else heapq.nsmallest(limit, matches)
+        return [(name, found) for found, _, _, name in matches]
+
+    @staticmethod
+    def _fuzzyDistance(query: str) -> int:
+        """
+        Returns the default largest edit distance for a fuzzy query of the given length.
+        """
+        return 0 if len(query) <= 2 else 1 if len(query) <= 5 else 2
+
+    @staticmethod
+    def _editDistances(source: str, targets: list) -> np.ndarray:
+        """
+        Computes the Levenshtein distance between the source and every target at once. The targets are packed into a matrix of code points, and every row of the dynamic programming table is computed for all of them with a few array operations: the insertions along the row are a cumulative minimum.
+
+        - Args:
+            - source (str): The source string
+            - targets (list): The target strings
+
+        - Returns:
+            - np.ndarray: The distance to every target
+        """
+        width = max(len(target) for target in targets)
+        codes = np.frombuffer("".join(target.ljust(width, "\0") for target in targets).encode("utf-32-le"), dtype=np.uint32).reshape(len(targets), width)
+        offsets = np.arange(width + 1, dtype=np.int32)
+        row = np.tile(offsets, (len(targets), 1))
+        for i, char in enumerate(np.frombuffer(source.encode("utf-32-le"), dtype=np.uint32), 1):
+            current = np.empty_like(row)
+            current[:, 0] = i
+            np.minimum(row[:, :-1] + (codes != char), row[:, 1:] + 1, out=current[:, 1:])
+            row = np.minimum.accumulate(current - offsets, axis=1) + offsets
+        return row[np.arange(len(targets)), [len(target) for target in targets]]
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compilePattern(query: str):
+        """
+        Compiles a case-insensitive regular expression, keeping the most recently used patterns.
+        """
+        return re.compile(query, re.IGNORECASE)
+
+    @classmethod
+    def _batchedMatches(cls, query: str) -> list:
+        """
+        Matches a regular expression against one newline-joined buffer of every name and maps the offsets of the matches back to the names. The buffer is rebuilt only after names are added or removed.
+        Queries that can see past the ends of a name in the buffer, i.e. with \\A, \\Z, \\z or \\G anchors, lookarounds or inline flags, are left to be matched name by name.
+
+        - Args:
+            - query (str): The regular expression
+
+        - Returns:
+            - list: The names that fully match the query, or None if the query depends on the buffer or a match ran across the delimiter, and the names have to be matched one by one
+        """
+        if cls._bufferUnsafePattern.search(query):
+            return None
+        if not cls._nameBuffer:
+            names = list(cls._nameIndex)
+            starts = []
+            offset = 0
+            for name in names:
+                starts.append(offset)
+                offset += len(name) + 1
+            cls._nameBuffer.extend(("\n".join(names), starts, names))
+        buffer, starts, names = cls._nameBuffer
+        try:
+            pattern = cls._compilePattern(f"(?m)^(?:{query})$")
+        except re.error:
+            return None
+        matches = []
+        for match in pattern.finditer(buffer):
+            if "\n" in match.group():
+                return None
+            matches.append(names[bisect_right(starts, match.start()) - 1])
+        return matches
+
+    @classmethod
+    def _resolveScopes(cls, superSet: str | tuple) -> tuple:
+        """
+        Looks up the groups that a superSet argument of advancedSearch refers to.
+
+        - Args:
+            - superSet (str | tuple): The group in the format accepted by advancedSearch
+
+        - Returns:
+            - tuple: The (type, name) of the groups
+        """
+        if isinstance(superSet, tuple):
+            return (superSet,) if superSet in cls._tree else ()
+        elif tuple(superSet.split(" ", 1)) in cls._tree:
+            return (tuple(superSet.split(" ", 1)),)
+        return tuple(key for key in cls._nameIndex.get(superSet, ()) if key in cls._tree)
+
+    @classmethod
+    def _scopeCandidates(cls, scopes: tuple, candidates: set = None) -> set:
+        """
+        Restricts the candidates of advancedSearch to the descendants of the given groups, either by enumerating their Euler-tour ranges or by testing each candidate, whichever is smaller.
+
+        - Args:
+            - scopes (tuple): The groups returned by resolveScopes
+            - candidates (set, optional): Keys that the result is restricted to. Defaults to None (every instance).
+
+        - Returns:
+            - set: The keys of the candidates under the groups
+        """
+        ranges = []
+        for scope in scopes:
+            enter, exit, _ = cls._intervals[scope]
+            ranges.append((bisect_left(cls._eulerOrder, (enter + 1,)), bisect_left(cls._eulerOrder, (exit,))))
+        if candidates is not None and len(candidates) < sum(last - first for first, last in ranges):
+            return {key for key in candidates if any(cls.isAncestor(scope, key) for scope in scopes)}
+        scoped = {entry[1] for first, last in ranges for entry in cls._eulerOrder[first:last]}
+        return scoped if candidates is None else scoped & candidates
+
+    @classmethod
+    def isAncestor(cls, ancestor: tuple, descendant: tuple) -> bool:
+        """
+        Checks in constant time whether a group is above another group or species in the tree.
+
+        - Args:
+            - ancestor (tuple): The (type, name) of the group
+            - descendant (tuple): The (type, name) of the group or species
+
+        - Returns:
+            - bool: True if the descendant is in the subbranches of the ancestor
+        """
+        enter, exit, _ = cls._intervals[ancestor]
+        return enter < cls._intervals[descendant][0] < exit
+
+    @classmethod
+    def lineage(cls, key: tuple) -> list:
+        """
+        Returns the groups above a group or species, from the top of the tree down to the group or species itself.
+
+        - Args:
+            - key (tuple): The (type, name) of the group or species
+
+        - Returns:
+            - list: The (type, name) of the groups of the lineage, ending with the key
+        """
+        serial = cls._instances[key]._serial
+        lineage = []
+        while serial >= 0:
+            lineage.append(cls._nodeKeys[serial])
+            serial = int(cls._parentIds[serial])
+        lineage.reverse()
+        return lineage
+
+    @classmethod
+    def lineageMany(cls, keys) -> list:
+        """
+        Returns the lineage of every given group or species.
+
+        - Args:
+            - keys (iterable): The (type, name) of the groups or species
+
+        - Returns:
+            - list: One lineage per key, in the format returned by lineage
+        """
+        return [cls.lineage(key) for key in keys]
+
+    @classmethod
+    def lca(cls, a: tuple, b: tuple) -> tuple:
+        """
+        Returns the lowest common ancestor of two groups or species, i.e. their closest shared group, in O(log depth) jumps of the binary lifting table. A group is its own ancestor, so the lowest common ancestor of a group and anything under it is the group itself.
+
+        - Args:
+            - a (tuple): The (type, name) of the first group or species
+            - b (tuple): The (type, name) of the second group or species
+
+        - Returns:
+            - tuple: The (type, name) of the lowest common ancestor, or None if the two are in different trees
+        """
+        serial = cls._commonAncestor(cls._instances[a]._serial, cls._instances[b]._serial)
+        return None if serial < 0 else cls._nodeKeys[serial]
+
+    @classmethod
+    def lcaMany(cls, pairs) -> list:
+        """
+        Returns the lowest common ancestor of every given pair, lifting all the pairs at once with vectorized lookups in the binary lifting table.
+
+        - Args:
+            - pairs (iterable): Pairs of (type, name) keys
+
+        - Returns:
+            - list: The (type, name) of the lowest common ancestor of every pair, or None for a pair in different trees
+        """
+        first, second = cls._pairSerials(pairs)
+        nodeKeys = cls._nodeKeys
+        return [None if serial < 0 else nodeKeys[serial] for serial in cls._commonAncestors(first, second).tolist()]
+
+    @classmethod
+    def distance(cls, a: tuple, b: tuple) -> int:
+        """
+        Returns the number of edges on the path between two groups or species through their lowest common ancestor.
+
+        - Args:
+            - a (tuple): The (type, name) of the first group or species
+            - b (tuple): The (type, name) of the second group or species
+
+        - Returns:
+            - int: The distance, or None if the two are in different trees
+        """
+        first, second = cls._instances[a]._serial, cls._instances[b]._serial
+        serial = cls._commonAncestor(first, second)
+        if serial < 0:
+            return None
+        return int(cls._depths[first]) + int(cls._depths[second]) - 2 * int(cls._depths[serial])
+
+    @classmethod
+    def distanceMany(cls, pairs) -> np.ndarray:
+        """
+        Returns the distance of every given pair.
+
+        - Args:
+            - pairs (iterable): Pairs of (type, name) keys
+
+        - Returns:
+            - np.ndarray: The distance of every pair, or -1 for a pair in different trees
+        """
+        first, second = cls._pairSerials(pairs)
+        ancestors = cls._commonAncestors(first, second)
+        depths = cls._depths
+        distances = depths[first].astype(np.int64) + depths[second] - 2 * depths[ancestors]
+        distances[ancestors < 0] = -1
+        return distances
+
+    @classmethod
+    def _pairSerials(cls, pairs) -> tuple:
+        """
+        Returns the ids of the first and of the second keys of the pairs as two arrays.
+        """
+        instances = cls._instances
+        serials = np.array([(instances[a]._serial, instances[b]._serial) for a, b in pairs], dtype=np.int64).reshape(-1, 2)
+        return serials[:, 0], serials[:, 1]
+
+    @classmethod
+    def _commonAncestor(cls, low: int, high: int) -> int:
+        """
+        Finds the lowest common ancestor of two node ids the same way as _commonAncestors, one jump at a time.
+        """
+        jumps, depths = cls._jumps, cls._depths
+        if depths[low] < depths[high]:
+            low, high = high, low
+        difference, level = int(depths[low] - depths[high]), 0
+        while difference:
+            if difference & 1:
+                low = int(jumps[level, low])
+            difference >>= 1
+            level += 1
+        if low == high:
+            return low
+        for level in range(len(jumps) - 1, -1, -1):
+            if jumps[level, low] != jumps[level, high]:
+                low, high = int(jumps[level, low]), int(jumps[level, high])
+        low, high = int(jumps[0, low]), int(jumps[0, high])
+        return low if low == high else -1
+
+    @classmethod
+    def _commonAncestors(cls, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """
+        Finds the lowest common ancestors of pairs of node ids. The deeper node of every pair is lifted to the depth of the other one bit by bit of their difference, and then both are lifted together by the largest jumps that keep them apart.
+
+        - Args:
+            - first (np.ndarray): The ids of the first nodes
+            - second (np.ndarray): The ids of the second nodes
+
+        - Returns:
+            - np.ndarray: The ids of the lowest common ancestors, or -1 for the pairs in different trees
+        """
+        jumps, depths = cls._jumps, cls._depths
+        deeper = depths[first] < depths[second]
+        low = np.where(deeper, second, first)
+        high = np.where(deeper, first, second)
+        low = cls._liftSerials(low, np.abs(depths[first].astype(np.int64) - depths[second]))
+        for level in range(len(jumps) - 1, -1, -1):
+            apart = jumps[level][low] != jumps[level][high]
+            low[apart] = jumps[level][low[apart]]
+            high[apart] = jumps[level][high[apart]]
+        same = low == high
+        low[~same] = jumps[0][low[~same]]
+        high[~same] = jumps[0][high[~same]]
+        low[low != high] = -1  # two roots, which are their own parents
+        return low
+
+    @classmethod
+    def _liftSerials(cls, serials: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """
+        Returns the ancestors the given numbers of steps above the given node ids, with one jump per bit of the steps.
+        """
+        serials = serials.copy()
+        for level in range(len(cls._jumps)):
+            lifted = (steps >> level) & 1 == 1
+            serials[lifted] = cls._jumps[level][serials[lifted]]
+        return serials
+
+    @classmethod
+    def _liftAncestors(cls, serials: list) -> None:
+        """
+        Sets the depths and the binary lifting rows of new nodes whose parent ids are set. The nodes must come after their parents, and a level row holds the ancestor 2^level steps up, with the top of the tree pointing at itself. A row is added for every power of two the deepest node passes.
+        """
+        depths, parents, jumps = cls._depths, cls._parentIds, cls._jumps
+        if len(serials) == 1:
+            serial = serials[0]
+            parent = int(parents[serial])
+            depths[serial] = deepest = 0 if parent < 0 else int(depths[parent]) + 1
+            jumps[0, serial] = ancestor = serial if parent < 0 else parent
+            for level in range(1, len(jumps)):
+                jumps[level, serial] = ancestor = int(jumps[level - 1, ancestor])
+        else:
+            for serial in serials:
+                parent = parents[serial]
+                depths[serial] = 0 if parent < 0 else depths[parent] + 1
+            serials = np.asarray(serials, dtype=np.int64)
+            if not len(serials):
+                return
+            jumps[0][serials] = np.where(parents[serials] < 0, serials, parents[serials])
+            for level in range(1, len(jumps)):
+                jumps[level][serials] = jumps[level - 1][jumps[level - 1][serials]]
+            deepest = int(depths[serials].max())
+        while deepest >= 1 << len(cls._jumps):
+            previous = cls._jumps[-1]
+            Group._jumps = np.concatenate((cls._jumps, previous[previous][np.newaxis]))
+
+    @classmethod
+    def descendants(cls, type: str, name: str) -> list:
+        """
+        Returns every group and species under the given group in pre-order, read as one contiguous range of the Euler tour.
+
+        - Args:
+            - type (str): Type of the group. e.g. Life, Kingdom, Genus
+            - name (str): Name of the group
+
+        - Returns:
+            - list: The (type, name) of the descendants
+        """
+        enter, exit, _ = cls._intervals[(type, name)]
+        first = bisect_left(cls._eulerOrder, (enter + 1,))
+        last = bisect_left(cls._eulerOrder, (exit,))
+        return [entry[1] for entry in cls._eulerOrder[first:last]]
+
+    @classmethod
+    def aggregate(cls, attr: str = "Weight", rank: str = "Genus", type: str = "Species") -> dict:
+        """
+        Computes the count, mean, minimum and maximum of a numeric attribute over the members of every group of a rank, e.g. the weight of the species of every genus. The members are matched to their group by following the parent ids of the whole population at once, and the statistics are computed from the attribute column.
+
+        - Args:
+            - attr (str, optional): The numeric attribute. Defaults to "Weight".
+            - rank (str, optional): Type of the groups to aggregate by. Defaults to "Genus".
+            - type (str, optional): Type of the members. Defaults to "Species".
+
+        - Returns:
+            - dict: A dict of {"count", "mean", "min", "max"} for every group that has members with a numeric value, keyed by its (type, name)
+        """
+        column = cls._columns.get(attr)
+        if column is None or type not in cls._typeCodes or rank not in cls._typeCodes:
+            return {}
+        size = len(cls._nodeKeys)
+        rankCode = cls._typeCodes[rank]
+        members = np.flatnonzero((cls._typeIds[:size] == cls._typeCodes[type]) & ~np.isnan(column[:size]))
+        owners = cls._parentIds[members]
+        climbing = (owners >= 0) & (cls._typeIds[np.maximum(owners, 0)] != rankCode)
+        while climbing.any():
+            owners[climbing] = cls._parentIds[owners[climbing]]
+            climbing = (owners >= 0) & (cls._typeIds[np.maximum(owners, 0)] != rankCode)
+        found = owners >= 0
+        values = column[members[found]]
+        groups, inverse = np.unique(owners[found], return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        totals = np.bincount(inverse, weights=values, minlength=len(groups))
+        lows = np.full(len(groups), np.inf)
+        highs = np.full(len(groups), -np.inf)
+        np.minimum.at(lows, inverse, values)
+        np.maximum.at(highs, inverse, values)
+        return {cls._nodeKeys[group]: {"count": int(count), "mean": float(total / count), "min": float(low), "max": float(high)}
+                for group, count, total, low, high in zip(groups.tolist(), counts, totals, lows, highs)}
+
+    def stats(self) -> dict:
+        """
+        Returns the rolled up statistics of the species under the group, or of the species itself. They are kept up to date on every insert, delete and attribute edit, so reading them does not walk the subtree.
+
+        - Returns:
+            - dict: The number of species, and the count, sum, mean, minimum and maximum of every numeric attribute of the species, including the inherited ones
+        """
+        species, values = self._rollupOf((self.type, self.name))
+        return {
+            "species": species,
+            "attributes": {attr: {"count": count, "sum": total, "mean": total / count, "min": low, "max": high}
+                           for attr, (count, total, low, high) in values.items()}
+        }
+
+    @classmethod
+    def rollup(cls, rank: str = "Family") -> dict:
+        """
+        Returns the stats of every group of the given rank.
+
+        - Args:
+            - rank (str, optional): Type of the groups. Defaults to "Family".
+
+        - Returns:
+            - dict: The stats of every group in insertion order, keyed by their (type, name)
+        """
+        groups = sorted(cls._typeIndex.get(rank, ()), key=lambda key: cls._instances[key]._serial)
+        return {key: cls._instances[key].stats() for key in groups}
+
+    @classmethod
+    def _insertInterval(cls, instance) -> None:
+        """
+        Gives the instance an Euler-tour interval inside the free space of its super group, relabeling the whole tree when the space runs out. Species take two labels and groups a share of the free space for their own subbranches.
+        """
+        superInterval = cls._intervals[instance.superSet]
+        gap = superInterval[1] - superInterval[2]
+        width = 1 if instance.type == "Species" else gap // cls._labelFanout
+        if width < 1 or gap <= width + 1:
+            cls._relabel(exclude=(instance.type, instance.name))
+            return cls._insertInterval(instance)
+        enter = superInterval[2]
+        superInterval[2] = enter + width + 1
+        cls._intervals[(instance.type, instance.name)] = [enter, enter + width, enter + 1]
+        insort(cls._eulerOrder, (enter, (instance.type, instance.name)))
+
+    @classmethod
+    def _relabel(cls, exclude: tuple = None) -> None:
+        """
+        Renumbers the Euler-tour intervals of the whole tree with labelSpacing between consecutive labels.
+        """
+        label = 0
+        cls._eulerOrder.clear()
+        stack = [(None, False)]
+        while stack:
+            key, exiting = stack.pop()
+            if exiting:
+                cls._intervals[key][2] = label + 1
+                label += cls._labelSpacing
+                cls._intervals[key][1] = label
+                continue
+            label += cls._labelSpacing
+            cls._intervals[key] = [label, None, label + 1]
+            if key is not None:
+                cls._eulerOrder.append((label, key))
+            stack.append((key, True))
+            children = cls._typeIndex.get("Life", ()) if key is None else cls._tree.get(key, ())
+            stack.extend((child, False) for child in reversed(list(children)) if child != exclude)
+
+    @classmethod
+    def _filterCandidates(cls, filters: dict, candidates: set = None) -> set:
+        """
+        Answers the filters of advancedSearch with the compiled predicate of the filters, over every node or only over the candidates.
+
+        - Args:
+            - filters (dict | Filter): The filters in the format accepted by advancedSearch
+            - candidates (set, optional): Keys that the result is restricted to. Defaults to None (every instance).
+
+        - Returns:
+            - set: The keys of the instances that match the filters
+        """
+        filter = filters if isinstance(filters, Filter) else Filter.fromDict(filters)
+        if candidates is None:
+            ids = None
+        else:
+            ids = np.fromiter((cls._instances[key]._serial for key in candidates), dtype=np.int64, count=len(candidates))
+        estimate, evaluate = cls._compileFilter(filter)
+        mask = evaluate(ids)
+        selected = np.flatnonzero(mask) if ids is None else ids[mask]
+        return {cls._nodeKeys[serial] for serial in selected.tolist()}
+
+    @classmethod
+    def _compileFilter(cls, filter: Filter) -> tuple:
+        """
+        Compiles a Filter into a pair of functions, once per Filter. The first estimates the number of matching nodes from the indexes and the rollups, and the second takes an array of node ids, or None for every node, and returns a boolean mask of the matching ones.
+        The operator of every condition is dispatched here rather than on every search. An and evaluates its most selective conditions first, each only on the nodes that passed the ones before, and an or evaluates its least selective conditions first, each only on the nodes that have not matched yet, and both stop as soon as the outcome is known.
+
+        - Args:
+            - filter (Filter): The filter
+
+        - Returns:
+            - tuple: The (estimate, evaluate) functions
+        """
+        if filter._predicate is not None:
+            return filter._predicate
+        if filter._kind == "condition":
+            predicate = cls._compileCondition(*filter._args)
+        elif filter._kind == "under":
+            predicate = cls._compileUnder(filter._args[0])
+        elif filter._kind == "not":
+            childEstimate, childEvaluate = cls._compileFilter(filter._children[0])
+
+            def evaluate(ids):
+                mask = ~childEvaluate(ids)
+                mask &= (cls._typeIds[:len(mask)] if ids is None else cls._typeIds[ids]) >= 0  # the ids of deleted nodes never match
+                return mask
+            predicate = (lambda: max(len(cls._instances) - childEstimate(), 0), evaluate)
+        else:
+            children = [cls._compileFilter(child) for child in filter._children]
+            conjunction = filter._kind == "and"
+
+            def estimate():
+                estimates = [childEstimate() for childEstimate, childEvaluate in children]
+                if conjunction:
+                    return min(estimates, default=len(cls._instances))
+                return min(sum(estimates), len(cls._instances))
+
+            def evaluate(ids):
+                size = len(cls._nodeKeys) if ids is None else len(ids)
+                ordered = sorted(children, key=lambda child: child[0](), reverse=not conjunction)
+                if not ordered:
+                    if not conjunction:
+                        return np.zeros(size, dtype=bool)
+                    return (cls._typeIds[:size] if ids is None else cls._typeIds[ids]) >= 0  # an empty and holds for every live node, but not for the ids of deleted nodes
+                mask = ordered[0][1](ids)
+                for childEstimate, childEvaluate in ordered[1:]:
+                    positions = np.flatnonzero(mask if conjunction else ~mask)
+                    if not len(positions):
+                        break
+                    matched = childEvaluate(positions if ids is None else ids[positions])
+                    if conjunction:
+                        mask[positions[~matched]] = False
+                    else:
+                        mask[positions[matched]] = True
+                return mask
+            predicate = (estimate, evaluate)
+        filter._predicate = predicate
+        return predicate
+
+    @classmethod
+    def _compileCondition(cls, attr: str, op: str, value) -> tuple:
+        """
+        Compiles a condition on an attribute for _compileFilter. Strings are looked up in the exact match index and numbers compared with the float64 column of the attribute.
+        """
+        def column(ids):
+            values = cls._columns.get(attr)
+            if values is None:
+                return None
+            return values[:len(cls._nodeKeys)] if ids is None else values[ids]
+
+        def spread():
+            count, low, high = 0, None, None
+            for root in cls._typeIndex.get("Life", ()):
+                values = cls._rollupOf(root)[1].get(attr)
+                if values is not None:
+                    count += values[0]
+                    low = values[2] if low is None else min(low, values[2])
+                    high = values[3] if high is None else max(high, values[3])
+            return count, low, high
+
+        if op == "exact":
+            number = cls._numeric(value)
+
+            def estimate():
+                found = len(cls._attrExactIndex.get(attr, {}).get(value.lower(), ())) if isinstance(value, str) else 0
+                if number is not None:
+                    count, low, high = spread()
+                    if count and low <= number <= high:
+                        found += count / (high - low + 1)
+                return found
+
+            def evaluate(ids):
+                values = column(ids)
+                matched = np.zeros(len(cls._nodeKeys) if ids is None else len(ids), dtype=bool)
+                if isinstance(value, str):
+                    keys = cls._attrExactIndex.get(attr, {}).get(value.lower(), ())
+                    if ids is not None and len(ids) * 8 < len(keys):  # reading a value through the chain of layers costs about eight key lookups
+                        instances, nodeKeys, lowered = cls._instances, cls._nodeKeys, value.lower()
+                        found = (None if key is None else instances[key].attributes.get(attr) for key in map(nodeKeys.__getitem__, ids.tolist()))  # an or also passes the ids of deleted nodes
+                        matched |= np.fromiter((isinstance(item, str) and item.lower() == lowered for item in found), dtype=bool, count=len(ids))
+                    else:
+                        serials = np.fromiter((cls._instances[key]._serial for key in keys), dtype=np.int64, count=len(keys))
+                        if ids is None:
+                            matched[serials] = True
+                        else:
+                            matched |= np.isin(ids, serials)
+                if number is not None and values is not None:
+                    matched |= values == number
+                return matched
+            return estimate, evaluate
+
+        if op == "range":
+            low, high, closed = cls._numeric(value[0]), cls._numeric(value[1]), (True, True)
+            valid = low is not None and high is not None
+        elif op in ("lt", "lte"):
+            low, high, closed = None, cls._numeric(value), (True, op == "lte")
+            valid = high is not None
+        else:
+            low, high, closed = cls._numeric(value), None, (op == "gte", True)
+            valid = low is not None
+
+        def estimate():
+            count, smallest, largest = spread()
+            if not valid or not count:
+                return 0
+            if largest == smallest:
+                return count
+            start = smallest if low is None else max(low, smallest)
+            stop = largest if high is None else min(high, largest)
+            return count * max(stop - start, 0) / (largest - smallest)
+
+        def evaluate(ids):
+            values = column(ids)
+            if not valid or values is None:
+                return np.zeros(len(cls._nodeKeys) if ids is None else len(ids), dtype=bool)
+            mask = np.ones(len(values), dtype=bool)
+            if low is not None:
+                mask &= values >= low if closed[0] else values > low
+            if high is not None:
+                mask &= values <= high if closed[1] else values < high
+            return mask
+        return estimate, evaluate
+
+    @classmethod
+    def _compileUnder(cls, superSet: str | tuple) -> tuple:
+        """
+        Compiles a condition on the place in the tree for _compileFilter. Every node is matched by reading the Euler-tour ranges of the groups, and given nodes by lifting them to the depth of each group with the binary lifting table.
+        """
+        def ranges():
+            found = []
+            for scope in cls._resolveScopes(superSet):
+                enter, exit, _ = cls._intervals[scope]
+                found.append((scope, bisect_left(cls._eulerOrder, (enter + 1,)), bisect_left(cls._eulerOrder, (exit,))))
+            return found
+
+        def evaluate(ids):
+            if ids is None:
+                matched = np.zeros(len(cls._nodeKeys), dtype=bool)
+                for scope, first, last in ranges():
+                    matched[[cls._instances[entry[1]]._serial for entry in cls._eulerOrder[first:last]]] = True
+                return matched
+            matched = np.zeros(len(ids), dtype=bool)
+            for scope in cls._resolveScopes(superSet):
+                serial = cls._instances[scope]._serial
+                steps = cls._depths[ids].astype(np.int64) - cls._depths[serial]
+                below = np.flatnonzero(steps > 0)
+                matched[below[cls._liftSerials(ids[below], steps[below]) == serial]] = True
+            return matched
+        return (lambda: sum(last - first for scope, first, last in ranges())), evaluate
+
+    @staticmethod
+    def _numeric(value) -> float:
+        """
+        Returns the value as a float if it is a number or a numeric string, and None otherwise.
+        """
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return number if number == number else None
+
+    @staticmethod
+    def _parseNumber(value):
+        """
+        Converts a numeric string to an int, or to a float if it is not a whole number, and returns any other value unchanged.
+        """
+        if not isinstance(value, str):
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            return float(value)
+        except ValueError:
+            return value
 
     @classmethod
-    def delete(cls, type: str, name: str) -> None:
+    def _indexAttribute(cls, instance, attr: str, value=None) -> None:
+        """
+        Adds the value of an attribute of the instance to the attribute indexes. Strings go to the exact match index and numbers, including numeric strings, to the float64 column of the attribute at the id of the instance. The value is looked up in the attributes of the instance unless it is given.
         """
-        Deletes the given group and all of its subbranches.
+        if value is None:
+            value = instance.attributes.get(attr)
+        if isinstance(value, str):
+            cls._attrExactIndex.setdefault(attr, {}).setdefault(value.lower(), set()).add((instance.type, instance.name))
+        number = cls._numeric(value)
+        if number is not None:
+            column = cls._columns.get(attr)
+            if column is None:
+                column = cls._columns[attr] = np.full(cls._columnSize, np.nan)
+            column[instance._serial] = number
 
-        - Args:
-            - type (str): Type of the group. e.g. Life, Kingdom, Genus
-            - name (str): Name of the group
+    @classmethod
+    def _unindexAttribute(cls, instance, attr: str, value=None) -> None:
         """
-        try:
-            cls._treeDiagram.remove_node(f"{type} {name}")
-        except NodeIDAbsentError:
-            pass
-        if type != "Life":
-            superSet = cls._instances[(type, name)].superSet
-            cls._tree[superSet].remove((type, name))
-        if type == "Species":
-            cls._instances.pop((type, name))
-            return
+        Removes the value of an attribute of the instance from the attribute indexes. The value is looked up in the attributes of the instance unless it is given.
+        """
+        if value is None:
+            value = instance.attributes.get(attr)
+        key = (instance.type, instance.name)
+        if isinstance(value, str):
+            values = cls._attrExactIndex[attr]
+            values[value.lower()].discard(key)
+            if not values[value.lower()]:
+                del values[value.lower()]
+        if cls._numeric(value) is not None:
+            cls._columns[attr][instance._serial] = np.nan
 
-        for type_sub, name_sub in cls._tree[(type, name)].copy():
-            cls.delete(type_sub, name_sub)
-        cls._instances.pop((type, name))
-        cls._tree.pop((type, name))
+    @staticmethod
+    def _grams(text: str, size: int = None) -> set:
+        """
+        Returns every substring of the text which is up to gramSize characters long, or exactly size characters long if size is given.
+        """
+        sizes = range(1, Group._gramSize + 1) if size is None else (size,)
+        return {text[i:i + n] for n in sizes for i in range(len(text) - n + 1)}
 
-    @property
-    def tree(self) -> dict:
+    @classmethod
+    def _register(cls, instance, bulk: bool = False) -> None:
         """
-        Returns the tree starting from the instance group.
+        Adds the instance to the search indexes and gives it the next integer id. In bulk mode the Euler intervals and the id of the super group are left for bulkLoad to set once every instance is registered.
+        The n-gram index holds arrays of ids, which stay sorted because the ids only grow.
+        """
+        key = (instance.type, instance.name)
+        instance._serial = len(cls._nodeKeys)
+        cls._nodeKeys.append(key)
+        if instance._serial >= cls._columnSize:
+            cls._growColumns(instance._serial + 1)
+        cls._typeIds[instance._serial] = cls._typeCodes.setdefault(instance.type, len(cls._typeCodes))
+        if not bulk:
+            cls._parentIds[instance._serial] = -1 if instance.superSet is None else cls._instances[instance.superSet]._serial
+            cls._liftAncestors([instance._serial])
+            if instance.type == "Species":
+                cls._pendingRollups.append(key)
+            else:
+                cls._rollups[key] = [0, {}]
+        if instance.name not in cls._nameIndex:
+            cls._nameBuffer.clear()
+            if bulk:
+                cls._sortedNames.clear()
+            elif cls._sortedNames:
+                insort(cls._sortedNames, instance.name, key=str.lower)
+        cls._nameIndex[instance.name] = cls._nameIndex.get(instance.name, ()) + (key,)
+        cls._typeIndex.setdefault(instance.type, set()).add(key)
+        cls._nameLengths[instance._serial] = len(instance.name.lower())
+        for gram in cls._grams(instance.name.lower()):
+            postings = cls._gramIndex.get(gram)
+            if postings is None:
+                postings = cls._gramIndex[gram] = array("I")
+            postings.append(instance._serial)
+        attributes = {}
+        for layer in reversed(instance.attributes.maps):
+            attributes.update(layer)
+        for attr, value in attributes.items():
+            cls._indexAttribute(instance, attr, value)
+        if not bulk:
+            cls._insertInterval(instance)
+            cls._touchSearch(key if instance.type != "Species" else instance.superSet)
+        elif instance.type != "Species":
+            cls._subtreeVersions[key] = cls._searchVersion + 1  # bulkLoad bumps the version once every instance is registered
+        cls._invalidateFragments(instance.superSet)
 
-        - Returns:
-            - dict: A dictionary containing every sub-group which is a subbranch of the group keyed by their supers.
+    @classmethod
+    def _unregister(cls, instance, attributes: dict = None) -> None:
         """
-        def completeTree(start : tuple) -> dict:
-            try:
-                tempDict = {start: self._tree[start]}
-                for group in self._tree[start]:
-                    tempDict.update(completeTree(group))
-                return tempDict
-            except KeyError:  # occurs when we reach a species
-                return dict()
-
-        if self.type == "Life":
-            return self._tree
-        elif self.type == "Species":
-            return {(self.type, self.name): None}
+        Removes the instance from the search indexes.
+        Its id is only cleared from the n-gram index, and the arrays are compacted once the cleared ids outnumber the live ones. The attributes of the instance, including the inherited ones, are read from its ChainMap unless they are given.
+        """
+        key = (instance.type, instance.name)
+        keys = tuple(other for other in cls._nameIndex[instance.name] if other != key)
+        if keys:
+            cls._nameIndex[instance.name] = keys
         else:
-            for key, value in self._tree.items():
-                if key[0] == self.type and key[1] == self.name:
-                    return completeTree(key)
+            del cls._nameIndex[instance.name]
+            cls._nameBuffer.clear()
+            if cls._sortedNames:
+                position = bisect_left(cls._sortedNames, instance.name.lower(), key=str.lower)
+                while cls._sortedNames[position] != instance.name:
+                    position += 1
+                del cls._sortedNames[position]
+        cls._typeIndex[instance.type].discard(key)
+        if not cls._typeIndex[instance.type]:
+            del cls._typeIndex[instance.type]
+        cls._nodeKeys[instance._serial] = None
+        cls._typeIds[instance._serial] = -1
+        cls._nameLengths[instance._serial] = -1
+        cls._depths[instance._serial] = -1
+        Group._deadNodes += 1
+        if cls._deadNodes > len(cls._instances) + cls._bulkDeleteSize:
+            cls._compactGrams()
+        if attributes is None:
+            attributes = dict(instance.attributes)
+        for attr, value in attributes.items():
+            cls._unindexAttribute(instance, attr, value)
+        del cls._intervals[key]
 
     @classmethod
-    def fullTreeView(cls) -> Tree:
+    def _growColumns(cls, size: int) -> None:
         """
-        Returns the full tree view
-
-        - Returns:
-            - Tree: an instance of he Tree class
+        Grows the columns indexed by node id to hold at least the given number of ids, doubling their size so that appends stay amortized constant time.
         """
-        return cls._treeDiagram
+        size = max(size, 2 * cls._columnSize, 1024)
+        extra = size - cls._columnSize
+        for attr, column in cls._columns.items():
+            cls._columns[attr] = np.concatenate((column, np.full(extra, np.nan)))
+        Group._parentIds = np.concatenate((cls._parentIds, np.full(extra, -1, dtype=np.int64)))
+        Group._depths = np.concatenate((cls._depths, np.full(extra, -1, dtype=np.int32)))
+        Group._jumps = np.concatenate((cls._jumps, np.zeros((len(cls._jumps), extra), dtype=np.int64)), axis=1)
+        Group._typeIds = np.concatenate((cls._typeIds, np.full(extra, -1, dtype=np.int32)))
+        Group._nameLengths = np.concatenate((cls._nameLengths, np.full(extra, -1, dtype=np.int32)))
+        Group._columnSize = size
 
-    @property
-    def subTreeView(self) -> Tree:
+    @classmethod
+    def _rollupOf(cls, key: tuple) -> list:
         """
-        Returns the tree view from the instance group
+        Returns the rollup of a group, refreshing it first if it is stale, or builds the rollup of a single species.
+
+        - Args:
+            - key (tuple): The (type, name) of the group or species
 
         - Returns:
-            - Tree: an instance of he Tree class
+            - list: [number of species, {attr: [count, sum, minimum, maximum]}]
         """
-        return self._treeDiagram.subtree(f"{self.type} {self.name}")
+        if cls._pendingRollups:
+            cls._flushRollups()
+        if key[0] == "Species":
+            attributes = {}
+            for layer in reversed(cls._instances[key].attributes.maps):
+                attributes.update(layer)
+            values = {}
+            for attr, value in attributes.items():
+                number = cls._numeric(value)
+                if number is not None:
+                    values[attr] = [1, number, number, number]
+            return [1, values]
+        if key in cls._staleRollups:
+            cls._refreshRollups(key)
+        return cls._rollups[key]
 
+    @staticmethod
+    def _mergeRollup(rollup: list, other: list) -> None:
+        """
+        Adds another rollup to the rollup in place.
+        """
+        rollup[0] += other[0]
+        values = rollup[1]
+        for attr, (count, total, low, high) in other[1].items():
+            current = values.get(attr)
+            if current is None:
+                values[attr] = [count, total, low, high]
+            else:
+                current[0] += count
+                current[1] += total
+                current[2] = min(current[2], low)
+                current[3] = max(current[3], high)
 
     @classmethod
-    def advancedSearch(cls, superSet: str = "", query: str = "", match_type: str = "", filters: dict = None) -> dict:
+    def _applyRollup(cls, key: tuple, delta: list, sign: int) -> None:
         """
-        Searches for instances that match the given query and filters, optionally restricted to a specific superSet.
+        Adds a rollup to, or subtracts it from, the given group and every group above it. The minimum and maximum cannot be undone by a subtraction, so a group whose minimum or maximum may have been removed is marked stale and refreshed from its subbranches when it is read.
 
         - Args:
-            - superSet (str, optional): The superSet to search within. Defaults to None (search all superSets).
-            - query (str, optional): The search query. Defaults to None (search all types and names).
-            - match_type (str, optional): The match type to use for the query. Can be "inclusive" (default), "exact", or "regular expression".
-            - filters (dict, optional): A dictionary of filters to apply. Each key should be an attribute name, and each value should be a tuple of (operator, value), where operator is one of "exact", "range", "lt" (less than), "lte" (less than or equal to), "gt" (greater than), or "gte" (greater than or equal to), and value is the value to compare against. Defaults to None (no filters applied).
+            - key (tuple): The (type, name) of the lowest group
+            - delta (list): The rollup to add or subtract
+            - sign (int): 1 to add, -1 to subtract
+        """
+        if cls._pendingRollups:
+            cls._flushRollups()
+        while key is not None:
+            if key in cls._staleRollups:  # recomputed from its subbranches when it is read
+                key = cls._instances[key].superSet
+                continue
+            rollup = cls._rollups[key]
+            if sign > 0:
+                cls._mergeRollup(rollup, delta)
+            else:
+                rollup[0] -= delta[0]
+                values = rollup[1]
+                for attr, (count, total, low, high) in delta[1].items():
+                    current = values[attr]
+                    current[0] -= count
+                    current[1] -= total
+                    if current[0] == 0:
+                        del values[attr]
+                    elif low <= current[2] or high >= current[3]:
+                        cls._staleRollups.add(key)
+            key = cls._instances[key].superSet
 
-        - Returns:
-            - dict: A dictionary containing the matching instances, keyed by their (type, name) tuples.
+    @classmethod
+    def _flushRollups(cls) -> None:
         """
-        matches = {}
-        for (type, name), instance in cls._instances.items():
-            if superSet != "":
-                if instance.superSet != superSet:
-                    continue
+        Adds the species inserted one by one since the last flush to the rollups of the groups above them. The rollups of the species are merged by super group, and the merged rollups are carried up one level at a time, so a group shared by many of them is updated once rather than once per species.
+        """
+        pending = list(cls._pendingRollups)
+        cls._pendingRollups.clear()
+        level = {}
+        for key in pending:
+            cls._mergeRollup(level.setdefault(cls._instances[key].superSet, [0, {}]), cls._rollupOf(key))
+        while level:
+            above = {}
+            for key, delta in level.items():
+                if key not in cls._staleRollups:  # recomputed from its subbranches when it is read
+                    cls._mergeRollup(cls._rollups[key], delta)
+                superSet = cls._instances[key].superSet
+                if superSet is not None:
+                    cls._mergeRollup(above.setdefault(superSet, [0, {}]), delta)
+            level = above
 
-            if query != "":
-                if match_type == "inclusive":
-                    if query.lower() not in instance.type.lower() and query.lower() not in instance.name.lower():
-                        continue
-                elif match_type == "exact":
-                    if query != instance.type and query != instance.name:
-                        continue
-                elif match_type == "regular expression":
-                    try:
-                        pattern = re.compile(query, re.IGNORECASE)
-                    except re.error as e:
-                        print(f"Regular expression error: {e}")
-                        continue
-                    try:
-                        type_search = pattern.search(instance.type).group()
-                    except AttributeError:
-                        type_search = None
+    @classmethod
+    def _shiftRollups(cls, instance, attr: str, old, new, affected: list) -> None:
+        """
+        Moves the species that inherit an attribute from the instance from its old value to its new one in the rollups of every group above them, without recomputing the other attributes. A group whose minimum or maximum may have been the old value is marked stale, and nothing is done when neither value is a number.
 
-                    try:
-                        name_search = pattern.search(instance.name).group()
-                    except AttributeError:
-                        name_search = None
+        - Args:
+            - instance (Group): The group or species whose attribute was written
+            - attr (str): The attribute
+            - old: The value the instance had before
+            - new: The value the instance has now
+            - affected (list): The instance and every subbranch that inherits the attribute from it, in pre-order, as returned by _writeAttribute
+        """
+        old, new = cls._numeric(old), cls._numeric(new)
+        if old == new:
+            return
+        if cls._pendingRollups:
+            cls._flushRollups()
+        counts = {}
+        for branch in reversed(affected):  # subbranches before their super groups
+            key = (branch.type, branch.name)
+            count = counts[key] = 1 if branch.type == "Species" else counts.get(key, 0)
+            if branch is not instance and count:
+                counts[branch.superSet] = counts.get(branch.superSet, 0) + count
+        total = counts[(instance.type, instance.name)]
+        groups = [(key, count) for key, count in counts.items() if key[0] != "Species" and count]
+        superSet = instance.superSet
+        while superSet is not None and total:
+            groups.append((superSet, total))
+            superSet = cls._instances[superSet].superSet
+        for key, count in groups:
+            if key in cls._staleRollups:
+                continue
+            values = cls._rollups[key][1]
+            current = values.get(attr)
+            if old is not None:
+                current[0] -= count
+                current[1] -= count * old
+                if current[0] == 0:
+                    del values[attr]
+                    current = None
+                elif old <= current[2] or old >= current[3]:
+                    cls._staleRollups.add(key)
+                    continue
+            if new is None:
+                continue
+            if current is None:
+                values[attr] = [count, count * new, new, new]
+            else:
+                current[0] += count
+                current[1] += count * new
+                current[2] = min(current[2], new)
+                current[3] = max(current[3], new)
 
-                    if type_search != instance.type and name_search != instance.name:
-                        continue
-                else:
-                    raise ValueError(
-                        f"Invalid match_type: {match_type}. Must be 'inclusive', 'exact', or 'regular expression'.")
-
-            if filters is not None and filters != {}:
-                match_all_filters = True
-                for attr, (op, value) in filters.items():
-                    if attr not in instance.attributes:
-                        match_all_filters = False
-                        break
+    @classmethod
+    def _refreshRollups(cls, key: tuple) -> None:
+        """
+        Recomputes the rollup of a stale group from the rollups of its subbranches, refreshing the stale ones among them first.
+        """
+        stack = [key]
+        while stack:
+            current = stack[-1]
+            stale = [subBranch for subBranch in cls._tree[current] if subBranch in cls._staleRollups]
+            if stale:
+                stack.extend(stale)
+                continue
+            stack.pop()
+            if current not in cls._staleRollups:
+                continue
+            rollup = [0, {}]
+            for subBranch in cls._tree[current]:
+                cls._mergeRollup(rollup, cls._rollupOf(subBranch))
+            cls._rollups[current] = rollup
+            cls._staleRollups.discard(current)
 
-                    attr_value = instance.attributes[attr]
-                    if op == "exact":
-                        if not isinstance(attr_value, str):
-                            match_all_filters = False
-                            break
-                        if value.lower() != attr_value.lower():
-                            match_all_filters = False
-                            break
-                    elif op == "range" and not (value[0] <= attr_value <= value[1]):
-                        match_all_filters = False
-                        break
-                    elif op == "lt" and not (attr_value < value):
-                        match_all_filters = False
-                        break
-                    elif op == "lte" and not (attr_value <= value):
-                        match_all_filters = False
-                        break
-                    elif op == "gt" and not (attr_value > value):
-                        match_all_filters = False
-                        break
-                    elif op == "gte" and not (attr_value >= value):
-                        match_all_filters = False
-                        break
+    @classmethod
+    def _rebuildRollups(cls, key: tuple) -> None:
+        """
+        Recomputes the rollups of the given group and of every group under it, merging every subbranch into its super group in reverse pre-order.
+        """
+        if key[0] == "Species":
+            return
+        if cls._pendingRollups:
+            cls._flushRollups()
+        order = [key] + cls.descendants(*key)
+        for current in order:
+            if current[0] != "Species":
+                cls._rollups[current] = [0, {}]
+                cls._staleRollups.discard(current)
+        for current in reversed(order[1:]):
+            cls._mergeRollup(cls._rollups[cls._instances[current].superSet], cls._rollupOf(current))
 
-                if match_all_filters:
-                    matches[(type, name)] = instance
+    @classmethod
+    def _compactGrams(cls) -> None:
+        """
+        Drops the ids of deleted instances from the n-gram index.
+        """
+        nodeKeys = cls._nodeKeys
+        for gram in list(cls._gramIndex):
+            postings = array("I", (serial for serial in cls._gramIndex[gram] if nodeKeys[serial] is not None))
+            if postings:
+                cls._gramIndex[gram] = postings
             else:
-                matches[(type, name)] = instance
+                del cls._gramIndex[gram]
+        Group._deadNodes = 0
 
-        return matches
-    
-    
     def createNew(line : str):
         type = re.search(r'type=\"(.*?)\"', line).group(1)
         name = re.search(r'name=\"(.*?)\"', line).group(1)
@@ -306,8 +2415,781 @@ class Group:
         for line in list(f.readlines()):
             cls.createNew(line = line)
 
+    @staticmethod
+    def parseLine(line: str) -> tuple:
+        """
+        Tokenizes a line of the text format in a single pass of the precompiled record grammar.
+        The values are read as they are written, so the records intentionally differ from what createNew makes of the same line: spaces inside quoted extraAttr values are kept ("Dark Blue", where createNew gives "DarkBlue"), a quoted value followed by another one does not keep its closing quote, and the last value keeps its last character, so a last numeric value such as 2.5 is not cut to 2.
+
+        - Args:
+            - line (str): A line in the format (type="...", name="...", superSet=("type", "name"), info="...", extraAttr=(key="value"))
+
+        - Returns:
+            - tuple: A record in the format (type, name, superSet, info, attributes, traits) where traits is (age, weight, size) for species and None otherwise. None is returned for blank lines.
+        """
+        fields = {}
+        for match in Group._fieldPattern.finditer(line):
+            fields.setdefault(match.group(1), (match.lastindex, match.group(match.lastindex)))
+        if "type" not in fields:
+            return None
+
+        type = sys.intern(fields["type"][1])
+        name = fields["name"][1]
+        superSet = info = traits = None
+        attributes = {}
+        if "superSet" in fields:
+            superSetMatch = Group._superSetPattern.fullmatch(fields["superSet"][1])
+            if superSetMatch:
+                superSet = superSetMatch.groups()
+        if "info" in fields:
+            info = fields["info"][1]
+        if "extraAttr" in fields:
+            for match in Group._fieldPattern.finditer(fields["extraAttr"][1]):
+                if match.lastindex == 2:
+                    attributes[match.group(1)] = match.group(2)
+                else:
+                    attributes[match.group(1)] = float(match.group(match.lastindex))
+        if type == "Species":
+            traits = tuple(fields[trait][1] if trait in fields else None for trait in ("age", "weight", "size"))
+        return (type, name, superSet, info, attributes, traits)
+
+    @classmethod
+    def createFromRecord(cls, record: tuple):
+        """
+        Creates a new group or species from a parsed record.
+
+        - Args:
+            - record (tuple): A record returned by parseLine
+
+        - Returns:
+            - Group | Species: The created instance
+        """
+        type, name, superSet, info, attributes, traits = record
+        if type == "Species":
+            age, weight, size = traits
+            return Species(name=name, superSet=superSet, age=age, weight=weight, size=size, info=info, attributes=attributes)
+        elif type == "Life":
+            return Group(type="Life", name=name, info=info, attributes=attributes)
+        return Group(type=type, name=name, superSet=superSet, info=info, attributes=attributes)
+
+    @classmethod
+    def parseFile(cls, fileName: str, progress=None):
+        """
+        Lazily parses a text file, one line at a time.
+
+        - Args:
+            - fileName (str): Path of the text file
+            - progress (callable, optional): Called with (bytesRead, fileSize) every progressLines lines and at the end. It can raise LoadCancelledException to stop reading. Defaults to None.
+
+        - Yields:
+            - tuple: The records of the file in the format returned by parseLine
+        """
+        with open(fileName, 'rt') as f:
+            size = os.fstat(f.fileno()).st_size
+            for number, line in enumerate(f, 1):
+                record = cls.parseLine(line)
+                if record is not None:
+                    yield record
+                if progress is not None and number % cls._progressLines == 0:
+                    progress(f.buffer.tell(), size)
+            if progress is not None:
+                progress(size, size)
+
+    @classmethod
+    def bulkLoad(cls, records) -> int:
+        """
+        Inserts many records at once. The records are validated together, inserted in parent-before-child order, so a parent may come after its children, and the tree diagram and the inherited attributes are built in a single pass at the end.
+
+        - Args:
+            - records (iterable): Records in the format returned by parseLine
+
+        - Returns:
+            - int: The number of inserted groups and species
+        """
+        line = None
+        if cls._journal is not None:
+            records = list(records)
+            line = Journal.encode("insert", records) if records else None
+        inserted = cls._bulkLoad(records)
+        cls._journalAppend(line)
+        return len(inserted)
+
+    @classmethod
+    def _bulkLoad(cls, records) -> list:
+        """
+        Inserts many records at once without writing to the journal. The Euler intervals of a load of up to bulkInsertSize nodes are inserted one by one, and a larger load relabels the whole tree once. If it fails after the records are validated, the inserted instances are taken back before the error is raised.
+
+        - Returns:
+            - list: The inserted records, in parent-before-child order
+        """
+        pending = {}
+        for record in records:
+            key = (record[0], record[1])
+            if key in cls._tree or key in cls._instances or key in pending:
+                raise GroupAlreadyExistsException
+            pending[key] = record
+
+        children = {}
+        roots = []
+        for key, record in pending.items():
+            if key[0] == "Life":
+                roots.append(key)
+                continue
+            superSet = record[2]
+            if superSet in cls._tree:
+                roots.append(key)
+            elif superSet in pending and superSet[0] != "Species":
+                children.setdefault(superSet, []).append(key)
+            else:
+                raise NoSuchSuperSetException
+
+        order = roots
+        for key in order:
+            order.extend(children.get(key, ()))
+        if len(order) != len(pending):  # the rest only reach each other through a cycle
+            raise NoSuchSuperSetException
+
+        created = {}
+        subBranches = {}
+        try:
+            cls._createRecords(pending, order, created, subBranches)
+        except BaseException:
+            cls._abortBulkLoad(pending, order, created)
+            raise
+        for key in order:
+            cls._addToDiagram(key, pending[key][2] if key[0] != "Life" else None)
+        return [pending[key] for key in order]
+
+    @classmethod
+    def _createRecords(cls, pending: dict, order: list, created: dict, subBranches: dict) -> None:
+        """
+        Creates and registers the validated records of bulkLoad, filling created and subBranches as it goes so that a failure can be undone.
+        """
+        for key in order:
+            type, name, superSet, info, attributes, traits = pending[key]
+            if type == "Species":
+                instance = Species.__new__(Species)
+                ownAttributes = {"Age": cls._parseNumber(traits[0]), "Weight": cls._parseNumber(traits[1]), "Size": cls._parseNumber(traits[2])}
+                ownAttributes.update(attributes)
+            else:
+                instance = Group.__new__(Group)
+                ownAttributes = attributes
+                subBranches[key] = {}
+            instance.type = type
+            instance.name = name
+            instance.superSet = superSet if type != "Life" else None
+            instance._info = info
+            if instance.superSet is None:
+                instance.attributes = ChainMap(dict(ownAttributes))
+            else:
+                superInstance = created[superSet] if superSet in created else cls._instances[superSet]
+                instance.attributes = superInstance.attributes.new_child(dict(ownAttributes))
+                if superSet in subBranches:
+                    subBranches[superSet][key] = None
+            created[key] = instance
+
+        for key in pending:
+            superSet = created[key].superSet
+            if key in subBranches:
+                cls._tree[key] = subBranches[key]
+            if superSet is not None and superSet not in subBranches:
+                cls._tree[superSet][key] = None
+            cls._instances[key] = created[key]
+            cls._register(created[key], bulk=True)
+        for key in pending:
+            superSet = created[key].superSet
+            cls._parentIds[created[key]._serial] = -1 if superSet is None else cls._instances[superSet]._serial
+        cls._liftAncestors([created[key]._serial for key in order])
+        if len(order) > cls._bulkInsertSize:
+            cls._relabel()
+        else:
+            for key in order:
+                if key not in cls._intervals:  # a relabel for want of space labels every node in the tree but the one being inserted
+                    cls._insertInterval(created[key])
+        for key in order:
+            superSet = pending[key][2] if key[0] != "Life" else None
+            if superSet is None or superSet not in pending:
+                cls._touchSearch(superSet)
+                cls._rebuildRollups(key)
+                if superSet is not None:
+                    cls._applyRollup(superSet, cls._rollupOf(key), 1)
+
+    @classmethod
+    def _abortBulkLoad(cls, pending: dict, order: list, created: dict) -> None:
+        """
+        Takes back the instances that a failed bulkLoad registered. Whether their rollups were added above them is not known, so the rollups of the registered groups and of every group above the load are marked stale and recomputed from what is left when they are read.
+        """
+        registered = [key for key in order if key in created and cls._instances.get(key) is created[key]]
+        for key in registered:
+            if key[0] != "Species":
+                cls._tree[key] = {child: None for child in cls._tree.get(key, ()) if child in cls._instances}
+                cls._rollups[key] = [0, {}]
+                cls._staleRollups.add(key)
+        for key in order:
+            superSet = pending[key][2] if key[0] != "Life" else None
+            if superSet is None or superSet in pending:
+                continue
+            if key not in registered:
+                cls._tree[superSet].pop(key, None)
+            while superSet is not None:
+                cls._staleRollups.add(superSet)
+                superSet = cls._instances[superSet].superSet
+        if any(key not in cls._intervals for key in registered):
+            cls._relabel()
+        for key in registered:
+            superSet = pending[key][2] if key[0] != "Life" else None
+            if superSet is None or superSet not in pending:
+                cls._delete(*key)
+
+    @classmethod
+    def streamFromFile(cls, fileName: str, bulk: bool = False, progress=None) -> dict:
+        """
+        Reads a text file like readFromFile, but streams the lines and parses each one with parseLine, which reads the extraAttr values as they are written where createNew alters them.
+
+        - Args:
+            - fileName (str): Path of the text file
+            - bulk (bool, optional): Loads the whole file through bulkLoad instead of creating the records one by one. Defaults to False.
+            - progress (callable, optional): Passed to parseFile. When it raises LoadCancelledException during a bulk load nothing is inserted. Defaults to None.
+
+        - Returns:
+            - dict: The number of loaded lines, the elapsed seconds and the lines per second.
+        """
+        start = time.perf_counter()
+        if bulk:
+            lines = cls.bulkLoad(cls.parseFile(fileName, progress))
+        else:
+            lines = 0
+            for record in cls.parseFile(fileName, progress):
+                cls.createFromRecord(record)
+                lines += 1
+        seconds = time.perf_counter() - start
+        return {"lines": lines, "seconds": seconds, "linesPerSecond": lines / seconds if seconds else 0.0}
+
+    @classmethod
+    def readFromFiles(cls, paths: list, workers: int = None) -> dict:
+        """
+        Reads many shard files of the text format at once. The files are parsed in parallel by a pool of processes, and the records are then merged and inserted by this process alone with bulkLoad, so a super group may be in another shard.
+        Records whose group already exists, or that repeat an earlier record, are skipped and reported, and so are records whose super group is in no shard, together with everything under them.
+
+        - Args:
+            - paths (list): Paths of the shard files
+            - workers (int, optional): Number of parsing processes. With 1 the files are parsed in this process. Defaults to the number of CPUs.
+
+        - Returns:
+            - dict: The number of loaded records, the skipped "duplicates" and "orphans" as lists of (type, name, fileName) tuples, and the elapsed seconds.
+        """
+        start = time.perf_counter()
+        paths = list(paths)
+        executor = None
+        if workers == 1 or len(paths) < 2:
+            shards = map(cls._parseShard, paths)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            shards = executor.map(cls._parseShard, paths)
+
+        pending = {}
+        origins = {}
+        duplicates = []
+        try:
+            for fileName, shard in zip(paths, shards):
+                for record in shard:
+                    key = (sys.intern(record[0]), record[1])
+                    if key in cls._instances or key in pending:
+                        duplicates.append((key[0], key[1], fileName))
+                        continue
+                    pending[key] = (key[0],) + record[1:]
+                    origins[key] = fileName
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        children = {}
+        reached = []
+        for key, record in pending.items():
+            superSet = record[2]
+            if key[0] == "Life" or superSet in cls._tree:
+                reached.append(key)
+            elif superSet in pending and superSet[0] != "Species":
+                children.setdefault(superSet, []).append(key)
+        for key in reached:
+            reached.extend(children.get(key, ()))
+        orphans = []
+        if len(reached) != len(pending):
+            reachedKeys = set(reached)
+            for key in list(pending):
+                if key not in reachedKeys:
+                    orphans.append((key[0], key[1], origins[key]))
+                    del pending[key]
+
+        loaded = cls.bulkLoad(pending.values())
+        return {"loaded": loaded, "duplicates": duplicates, "orphans": orphans, "seconds": time.perf_counter() - start}
+
+    @staticmethod
+    def _parseShard(fileName: str) -> list:
+        """
+        Parses a whole shard file in a worker process of readFromFiles.
+
+        - Args:
+            - fileName (str): Path of the text file
+
+        - Returns:
+            - list: The records of the file in the format returned by parseLine
+        """
+        return list(Group.parseFile(fileName))
+
+    @classmethod
+    def saveSnapshot(cls, path: str) -> int:
+        """
+        Saves every group and species to a compact binary snapshot that loadSnapshot can read back without parsing any text.
+        The file holds a versioned header, a string table shared by the types, names, infos, attribute names and string values, one array per node field with the super group stored as the index of its node, and the own attributes of the nodes stored column by column, with tuples, lists and dicts stored as the JSON text that the journal writes for them.
+        It is followed by the search indexes with the nodes renumbered by their position in the file: the depths, the name lengths, the Euler-tour order, the n-gram postings, the numeric attribute columns and the exact match index, so loadSnapshot can take them as they are instead of rebuilding them.
+
+        - Args:
+            - path (str): Path of the snapshot file
+
+        - Returns:
+            - int: The number of saved groups and species
+        """
+        strings = {None: 0}
+        def stringId(text: str) -> int:
+            return strings.setdefault(text, len(strings))
+
+        positions = {key: position for position, key in enumerate(cls._instances)}
+        types, names, parents, infos, nodeLayouts = (array("I"), array("I"), array("i"), array("I"), array("I"))
+        layouts = {}
+        columns = {}
+        for position, instance in enumerate(cls._instances.values()):
+            types.append(stringId(instance.type))
+            names.append(stringId(instance.name))
+            parents.append(-1 if instance.superSet is None else positions[instance.superSet])
+            infos.append(stringId(instance._info))
+            ownAttributes = instance.attributes.maps[0]
+            layout = tuple(stringId(attr) for attr in ownAttributes)
+            nodeLayouts.append(layouts.setdefault(layout, len(layouts)))
+            for attr, value in ownAttributes.items():
+                if value is None:
+                    kind = 0
+                elif isinstance(value, str):
+                    kind, value = 1, stringId(value)
+                elif isinstance(value, bool):
+                    kind = 4
+                elif isinstance(value, float):
+                    kind = 2
+                elif isinstance(value, int):
+                    kind = 3
+                else:
+                    try:
+                        kind, value = 5, stringId(json.dumps(Journal.encodeValue(value), separators=(",", ":")))
+                    except TypeError as error:
+                        raise SnapshotFormatException(f"Cannot save the {type(value).__name__} value of {attr}") from error
+                column = columns.get((attr, kind))
+                if column is None:
+                    column = columns[(attr, kind)] = (array("I"), array(("B", "I", "d", "q", "B", "I")[kind]))
+                column[0].append(position)
+                if kind:
+                    column[1].append(value)
+
+        layoutOffsets, layoutAttrs = array("I", [0]), array("I")
+        for layout in layouts:
+            layoutAttrs.extend(layout)
+            layoutOffsets.append(len(layoutAttrs))
+        columnHeads = array("I")
+        for (attr, kind), (nodes, values) in columns.items():
+            columnHeads.extend((stringId(attr), kind, len(nodes)))
+
+        serials = np.fromiter((instance._serial for instance in cls._instances.values()), dtype=np.int64, count=len(positions))
+        renumber = np.full(len(cls._nodeKeys), -1, dtype=np.int64)
+        renumber[serials] = np.arange(len(positions))
+        gramHeads, gramPostings = array("I"), []
+        for gram, postings in cls._gramIndex.items():
+            members = renumber[np.frombuffer(postings, dtype=np.uint32)]
+            members = members[members >= 0]  # the ids of deleted nodes are only cleared when the arrays are compacted
+            if len(members):
+                gramHeads.extend((stringId(gram), len(members)))
+                gramPostings.append(members)
+        numericHeads, numericValues = array("I"), []
+        for attr, column in cls._columns.items():
+            numericHeads.append(stringId(attr))
+            numericValues.append(column[serials])
+        exactHeads, exactMembers = array("I"), array("I")
+        for attr, values in cls._attrExactIndex.items():
+            for value, keys in values.items():
+                exactHeads.extend((stringId(attr), stringId(value), len(keys)))
+                exactMembers.extend(positions[key] for key in keys)
+
+        encoded = [text.encode("utf-8") for text in strings if text is not None]
+        lengths = array("I", [0xFFFFFFFF])
+        lengths.extend(len(text) for text in encoded)
+        blocks = [lengths, b"".join(encoded), types, names, parents, infos, nodeLayouts, layoutOffsets, layoutAttrs, columnHeads]
+        for nodes, values in columns.values():
+            blocks.extend((nodes, values))
+        blocks.extend(np.asarray(block, dtype=dtype).tobytes() for block, dtype in ((cls._depths[serials], "<i4"), (cls._nameLengths[serials], "<i4")))
+        blocks.append(array("I", (positions[key] for label, key in cls._eulerOrder)))
+        blocks.append(gramHeads)
+        blocks.extend(np.asarray(members, dtype="<u4").tobytes() for members in gramPostings)
+        blocks.append(numericHeads)
+        blocks.extend(np.asarray(values, dtype="<f8").tobytes() for values in numericValues)
+        blocks.extend((exactHeads, exactMembers))
+
+        with open(path, "wb") as f:
+            f.write(cls._snapshotHeader.pack(cls._snapshotMagic, cls._snapshotVersion, len(strings), len(positions), len(layouts), len(columns), len(gramHeads) // 2, len(numericHeads), len(exactHeads) // 3))
+            for block in blocks:
+                if isinstance(block, array) and sys.byteorder == "big":
+                    block = array(block.typecode, block)
+                    block.byteswap()
+                f.write(block)
+        return len(positions)
+
+    @classmethod
+    def loadSnapshot(cls, path: str) -> int:
+        """
+        Loads a snapshot written by saveSnapshot. The file is read in one call and its arrays are copied out of it without parsing any text.
+        Into an empty tree the nodes are created directly with the ids they had in the file, and the search indexes are taken from the file instead of being rebuilt. The rollups are left stale and computed when they are first read, and the tree diagram is rebuilt from _tree the next time it is viewed.
+        Into a tree that already holds groups the nodes are inserted through bulkLoad, which adds them to the groups already loaded and rebuilds every index.
+
+        - Args:
+            - path (str): Path of the snapshot file
+
+        - Returns:
+            - int: The number of loaded groups and species
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < cls._snapshotHeader.size:
+            raise SnapshotFormatException(f"{path} is not a valid snapshot")
+        with memoryview(data) as view:
+            try:
+                offset = cls._snapshotHeader.size
+                magic, version, stringCount, nodeCount, layoutCount, columnCount, gramCount, numericCount, exactCount = cls._snapshotHeader.unpack_from(view)
+                if magic != cls._snapshotMagic or version != cls._snapshotVersion:
+                    raise SnapshotFormatException(f"{path} is not a version {cls._snapshotVersion} snapshot")
+
+                def read(typecode: str, length: int):
+                    nonlocal offset
+                    block = array(typecode)
+                    end = offset + length * block.itemsize
+                    if end > len(view):
+                        raise SnapshotFormatException(f"{path} is truncated")
+                    block.frombytes(view[offset:end])
+                    offset = end
+                    if sys.byteorder == "big":
+                        block.byteswap()
+                    return block
+
+                def readArray(dtype: str, length: int) -> np.ndarray:
+                    nonlocal offset
+                    block = np.frombuffer(data, dtype=dtype, count=length, offset=offset) if length else np.empty(0, dtype=dtype)
+                    offset += block.nbytes
+                    return block.astype(dtype[1:])
+
+                lengths = read("I", stringCount)
+                blob = read("B", sum(lengths[1:])).tobytes()
+                strings = [None]
+                start = 0
+                for length in lengths[1:]:
+                    strings.append(blob[start:start + length].decode("utf-8"))
+                    start += length
+                types, names, parents, infos, nodeLayouts = (read(typecode, nodeCount) for typecode in "IIiII")
+                layoutOffsets = read("I", layoutCount + 1)
+                layoutAttrs = read("I", layoutOffsets[-1])
+                columnHeads = read("I", columnCount * 3)
+                columns = []
+                for i in range(0, len(columnHeads), 3):
+                    attr, kind, length = columnHeads[i:i + 3]
+                    columns.append((strings[attr], kind, read("I", length), read(("B", "I", "d", "q", "B", "I")[kind], length if kind else 0)))
+                depths, nameLengths, eulerOrder = readArray("<i4", nodeCount), readArray("<i4", nodeCount), readArray("<u4", nodeCount)
+                gramHeads = read("I", gramCount * 2)
+                grams = {strings[gramHeads[i]]: readArray("<u4", gramHeads[i + 1]) for i in range(0, len(gramHeads), 2)}
+                numericHeads = read("I", numericCount)
+                numericColumns = {strings[attr]: readArray("<f8", nodeCount) for attr in numericHeads}
+                exactHeads = read("I", exactCount * 3)
+                exactMembers = read("I", sum(exactHeads[2::3]))
+                exactValues = {}
+                start = 0
+                for i in range(0, len(exactHeads), 3):
+                    attr, value, length = exactHeads[i:i + 3]
+                    exactValues.setdefault(strings[attr], {})[strings[value]] = exactMembers[start:start + length]
+                    start += length
+                if offset != len(view):
+                    raise SnapshotFormatException(f"{path} is not a valid snapshot")
+            except (struct.error, IndexError, UnicodeDecodeError, ValueError) as error:
+                raise SnapshotFormatException(f"{path} is not a valid snapshot") from error
+
+        layouts = [tuple(strings[attr] for attr in layoutAttrs[layoutOffsets[i]:layoutOffsets[i + 1]]) for i in range(layoutCount)]
+        ownAttributes = [dict.fromkeys(layouts[layout]) for layout in nodeLayouts]
+        for attr, kind, nodes, values in columns:
+            if kind == 0:
+                continue
+            if kind == 1:
+                values = [strings[value] for value in values]
+            elif kind == 4:
+                values = [bool(value) for value in values]
+            elif kind == 5:
+                values = [Journal.decodeValue(json.loads(strings[value])) for value in values]
+            for position, value in zip(nodes, values):
+                ownAttributes[position][attr] = value
+
+        if not cls._instances:
+            typeNames = {code: sys.intern(strings[code]) for code in set(types)}
+            keys = [(typeNames[type], strings[name]) for type, name in zip(types, names)]
+            cls._restoreSnapshot(keys, parents, [strings[info] for info in infos], ownAttributes, (depths, nameLengths, eulerOrder, grams, numericColumns, exactValues))
+            return nodeCount
+
+        records = []
+        for position in range(nodeCount):
+            type, name, attributes = strings[types[position]], strings[names[position]], ownAttributes[position]
+            parent = parents[position]
+            superSet = None if parent < 0 else (strings[types[parent]], strings[names[parent]])
+            traits = None
+            if type == "Species":
+                traits = (attributes.pop("Age", None), attributes.pop("Weight", None), attributes.pop("Size", None))
+            records.append((type, name, superSet, strings[infos[position]], attributes, traits))
+        Group._diagramStale = True
+        return cls.bulkLoad(records)
+
+    @classmethod
+    def _restoreSnapshot(cls, keys: list, parents: array, infos: list, ownAttributes: list, indexes: tuple) -> None:
+        """
+        Fills an empty tree with the nodes of a snapshot, giving every node its position in the file as its id and taking the search indexes from the file. The rollups of the groups are marked stale, so each is computed from its subbranches when it is first read.
+
+        - Args:
+            - keys (list): The (type, name) of every node
+            - parents (array): The position of the super group of every node, or -1
+            - infos (list): The brief info of every node
+            - ownAttributes (list): The own attributes of every node
+            - indexes (tuple): The depths, name lengths, Euler-tour order, n-gram postings, numeric columns and exact match index read from the file
+        """
+        depths, nameLengths, eulerOrder, grams, numericColumns, exactValues = indexes
+        count = len(keys)
+        parentIds = np.asarray(parents, dtype=np.int64)
+        cls._nodeKeys[:] = keys
+        Group._deadNodes = 0
+        for index in (cls._nameIndex, cls._typeIndex, cls._gramIndex, cls._columns, cls._attrExactIndex, cls._rollups, cls._fragments, cls._treeCache, cls._editVersions):
+            index.clear()
+        cls._staleRollups.clear()
+        cls._pendingRollups.clear()
+        cls._nameBuffer.clear()
+        cls._sortedNames.clear()
+        Group._columnSize = 0
+        Group._parentIds, Group._depths, Group._typeIds, Group._nameLengths = (np.full(0, -1, dtype=dtype) for dtype in (np.int64, np.int32, np.int32, np.int32))
+        Group._jumps = np.zeros((1, 0), dtype=np.int64)
+        cls._growColumns(count)
+        cls._parentIds[:count] = parentIds
+        cls._depths[:count] = depths
+        cls._nameLengths[:count] = nameLengths
+        typeCodes = {type: cls._typeCodes.setdefault(type, len(cls._typeCodes)) for type in {key[0] for key in keys}}
+        cls._typeIds[:count] = [typeCodes[key[0]] for key in keys]
+        # the binary lifting rows are built a whole row at a time, since every row only depends on the one before it
+        deepest = int(depths.max()) if count else 0
+        jumps = np.zeros((max(1, deepest.bit_length()), cls._columnSize), dtype=np.int64)
+        jumps[0, :count] = np.where(parentIds < 0, np.arange(count), parentIds)
+        for level in range(1, len(jumps)):
+            jumps[level, :count] = jumps[level - 1][jumps[level - 1, :count]]
+        Group._jumps = jumps
+
+        byDepth = np.argsort(depths, kind="stable")
+        instances = [None] * count
+        for position in byDepth.tolist():  # super groups before their subbranches
+            type, name = keys[position]
+            instance = (Species if type == "Species" else Group).__new__(Species if type == "Species" else Group)
+            instance.type = type
+            instance.name = name
+            instance._info = infos[position]
+            instance._serial = position
+            parent = parents[position]
+            if parent < 0:
+                instance.superSet = None
+                instance.attributes = ChainMap(ownAttributes[position])
+            else:
+                instance.superSet = keys[parent]
+                instance.attributes = instances[parent].attributes.new_child(ownAttributes[position])
+            instances[position] = instance
+        cls._instances.update(zip(keys, instances))
+
+        nameIndex = {}
+        for key in keys:
+            if key[0] != "Species":
+                cls._tree[key] = {}
+            nameIndex.setdefault(key[1], []).append(key)
+            cls._typeIndex.setdefault(key[0], set()).add(key)
+        cls._nameIndex.update((name, tuple(nameKeys)) for name, nameKeys in nameIndex.items())
+        for key, parent in zip(keys, parents):
+            if parent >= 0:
+                cls._tree[keys[parent]][key] = None
+        for gram, members in grams.items():
+            postings = cls._gramIndex[gram] = array("I")
+            postings.frombytes(members.astype(np.uint32).tobytes())
+        for attr, values in numericColumns.items():
+            column = cls._columns[attr] = np.full(cls._columnSize, np.nan)
+            column[:count] = values
+        for attr, values in exactValues.items():
+            cls._attrExactIndex[attr] = {value: {keys[position] for position in members} for value, members in values.items()}
+
+        # the labels _relabel would give: a node entered at pre-order index i and depth d comes after i enters and i - d exits, and leaves after the enter and exit of each node under it
+        sizes = np.ones(count, dtype=np.int64)
+        bounds = np.searchsorted(depths[byDepth], np.arange(deepest + 2))
+        for depth in range(deepest, 0, -1):
+            level = byDepth[bounds[depth]:bounds[depth + 1]]
+            np.add.at(sizes, parentIds[level], sizes[level])
+        eulerOrder = eulerOrder.astype(np.int64)
+        enters = 2 * np.arange(count) - depths[eulerOrder] + 2
+        exits = enters + 2 * sizes[eulerOrder] - 1
+        spacing = cls._labelSpacing
+        orderKeys = [keys[position] for position in eulerOrder.tolist()]
+        enterLabels = [enter * spacing for enter in enters.tolist()]
+        cls._intervals.clear()
+        cls._intervals[None] = [spacing, (2 * count + 2) * spacing, (2 * count + 1) * spacing + 1]
+        cls._intervals.update(zip(orderKeys, ([enter, exit * spacing, (exit - 1) * spacing + 1] for enter, exit in zip(enterLabels, exits.tolist()))))
+        cls._eulerOrder[:] = zip(enterLabels, orderKeys)
+
+        groups = [key for key in keys if key[0] != "Species"]
+        cls._rollups.update((key, [0, {}]) for key in groups)
+        cls._staleRollups.update(groups)
+        cls._subtreeVersions.clear()
+        cls._subtreeVersions.update(dict.fromkeys(groups, cls._searchVersion + 1))
+        cls._touchSearch(None)
+        cls._invalidateFragments(None)
+        Group._diagramStale = True
+        if cls._journal is not None:
+            cls._journalAppend(Journal.encode("insert", [cls._recordOf(key) for key in keys]))
+
+    @classmethod
+    def openJournal(cls, path: str, base: str = None, syncRecords: int = 64, syncSeconds: float = 1.0, compactBytes: int = 1 << 24) -> dict:
+        """
+        Starts recording every insert, delete, attribute edit and batch in an append-only journal, so the changes survive a restart without rewriting the whole tree on each one.
+        The base snapshot is loaded first, if it exists, and then the changes in the journal are replayed on top of it. Without a base the journal is replayed on top of the groups already loaded, e.g. from the original text file.
+        With a base, the journal is compacted into a fresh base snapshot once it grows larger than both compactBytes and the base, so replaying it never costs more than loading the base.
+
+        - Args:
+            - path (str): Path of the journal file. It is created if it does not exist.
+            - base (str, optional): Path of the base snapshot. Defaults to None.
+            - syncRecords (int, optional): The journal is synced to the disk once this many changes have been written since the last sync. Defaults to 64.
+            - syncSeconds (float, optional): The journal is also synced when a change is written this many seconds after the last sync. Defaults to 1.0.
+            - compactBytes (int, optional): The smallest journal size in bytes that is compacted. Defaults to 16 MiB.
+
+        - Returns:
+            - dict: The number of groups and species loaded from the base, the number of replayed changes and the elapsed seconds.
+        """
+        start = time.perf_counter()
+        cls.closeJournal()
+        loaded = 0
+        checksum = None
+        if base is not None and os.path.exists(base):
+            loaded = cls.loadSnapshot(base)
+            checksum = Journal.checksum(base)
+        replayed = 0
+        if os.path.exists(path):
+            started, entries = Journal.read(path)
+            if started == checksum:
+                cls._replayJournal(path, entries)
+                replayed = len(entries)
+            elif checksum is not None and entries and entries[-1] == ["compacted", checksum]:
+                Journal.create(path, checksum)  # the journal was compacted into this base, and the process stopped before starting it again
+            elif started is not None and checksum is None:
+                raise JournalFormatException(f"{path} was started from the base snapshot {base}, which is missing")
+            else:
+                raise JournalFormatException(f"{path} was not started from the base snapshot {base}")
+        else:
+            Journal.create(path, checksum)
+        Group._journal = Journal(path, base, checksum, syncRecords, syncSeconds, compactBytes)
+        return {"base": loaded, "replayed": replayed, "seconds": time.perf_counter() - start}
+
+    @classmethod
+    def syncJournal(cls) -> None:
+        """
+        Forces the changes written to the journal so far to the disk.
+        """
+        if cls._journal is not None:
+            cls._journal.sync()
+
+    @classmethod
+    def closeJournal(cls) -> None:
+        """
+        Syncs and closes the journal, after which the changes are no longer recorded.
+        """
+        if cls._journal is not None:
+            cls._journal.close()
+            Group._journal = None
+
+    @classmethod
+    def compactJournal(cls) -> int:
+        """
+        Saves every group and species to a fresh base snapshot and empties the journal. The snapshot is written beside the old base, its checksum is appended to the journal, and it is renamed over the old base. The journal is then started again from its checksum, so after a crash at any point either the old base and the journal or the new base alone are replayed, and the journal is only dropped when it ends with the checksum of the base.
+
+        - Returns:
+            - int: The number of saved groups and species
+        """
+        journal = cls._journal
+        if journal is None or journal.base is None:
+            raise ValueError("Only a journal with a base snapshot can be compacted")
+        temporary = journal.base + ".tmp"
+        saved = cls.saveSnapshot(temporary)
+        with open(temporary, "r+b") as f:
+            os.fsync(f.fileno())
+        checksum = Journal.checksum(temporary)
+        journal.append(Journal.encode("compacted", checksum))
+        journal.close()
+        os.replace(temporary, journal.base)
+        Journal.syncDirectory(journal.base)
+        Journal.create(journal.path, checksum)
+        Group._journal = Journal(journal.path, journal.base, checksum, journal.syncRecords, journal.syncSeconds, journal.compactBytes)
+        return saved
+
+    @classmethod
+    def _journalAppend(cls, line: bytes) -> None:
+        """
+        Writes a change encoded by Journal.encode to the journal, and compacts the journal once it has outgrown its base. The change is encoded before it is made, so a value the journal cannot hold is rejected before anything changes, and line is None when no journal was open.
+        """
+        journal = cls._journal
+        if journal is None or line is None:
+            return
+        journal.append(line)
+        if journal.base is not None and journal.size > max(journal.compactBytes, journal.baseSize):
+            cls.compactJournal()
+
+    @classmethod
+    def _replayJournal(cls, path: str, entries: list) -> None:
+        """
+        Applies the changes read from a journal. Runs of inserts are loaded together with a single bulkLoad, and batches are applied through batch, so they are applied whole or not at all like when they were recorded.
+        """
+        inserts = []
+        first = 2
+        for number, entry in enumerate(entries + [None], 2):
+            try:
+                if entry is not None:
+                    entry = Journal.decode(entry)
+                if entry is not None and entry[0] == "insert":
+                    if not inserts:
+                        first = number
+                    inserts.extend(entry[1])
+                    continue
+                if inserts:
+                    cls.bulkLoad(inserts)
+                    inserts = []
+                if entry is None:
+                    break
+                first = number
+                operation = entry[0]
+                if operation == "delete":
+                    cls.delete(entry[1], entry[2])
+                elif operation == "edit":
+                    cls._instances[(entry[1], entry[2])].info = (entry[3], entry[4])
+                elif operation == "batch":
+                    with cls.batch() as batch:
+                        for key in entry[1]:
+                            batch.delete(*key)
+                        for record in entry[2]:
+                            batch.insert(record)
+                        for key, attr, value in entry[3]:
+                            batch.edit(*key, attr, value)
+                elif operation != "compacted":  # left by a compaction that stopped before replacing the base
+                    raise ValueError(f"unknown change {operation!r}")
+            except (GroupAlreadyExistsException, NoSuchSuperSetException, KeyError, TypeError, ValueError) as error:
+                raise JournalFormatException(f"Lines {first} to {number} of {path} cannot be replayed: {type(error).__name__} {error}") from error
+
 class Species(Group):
 
+    __slots__ = ()
 
     def __init__(self, name: str, superSet: tuple, age: int | float, weight: int | float, size: int | float, info: str, attributes : dict = None) -> None:
         """
@@ -323,37 +3205,28 @@ class Species(Group):
             - attributes (dictionary, optional): Main attributes of the group
         """
 
-        if (type, name) in self._tree.keys():
+        if ("Species", name) in self._instances:
             raise GroupAlreadyExistsException
-        if superSet == None:
-            raise NoSuchSuperSetException
-        try:
-            self._tree[superSet].append(("Species", name))
-        except KeyError:
+        if superSet not in self._tree:
             raise NoSuchSuperSetException
+        ownAttributes = {
+            "Age": self._parseNumber(age),
+            "Weight": self._parseNumber(weight),
+            "Size": self._parseNumber(size)
+        }
+        if attributes:
+            ownAttributes.update(attributes)
+        line = None
+        if self._journal is not None:
+            traits = (ownAttributes["Age"], ownAttributes["Weight"], ownAttributes["Size"])
+            line = Journal.encode("insert", [("Species", name, superSet, info, ownAttributes, traits)])
+        self._tree[superSet][("Species", name)] = None
         self._instances.update({("Species", name): self})
         self.name = name
         self.type = "Species"
         self.superSet = superSet
         self._info = info
-        self.attributes = {
-            "Age": age,
-            "Weight": weight,
-            "Size": size
-        }
-        self.attributes.update(attributes)
-        self.attributes = self.completeAttr(self)
-        Group._treeDiagram.create_node(
-            tag=f"{self.name} ({self.type})", identifier=f"{self.type} {self.name}", parent=f"{superSet[0]} {superSet[1]}")
-
-    def completeAttr(self, start):
-        def subfunc(start: Group) -> dict:
-            attr = {}
-            if start.superSet != None:
-                upperAttr = subfunc(self._instances[start.superSet])
-                if upperAttr:
-                    attr.update(upperAttr)
-            if start.attributes:
-                attr.update(start.attributes)
-            return attr
-        return subfunc(start)
\ No newline at end of file
+        self.attributes = self._layerAttributes(superSet, ownAttributes)
+        self._register(self)
+        self._addToDiagram(("Species", name), superSet)
+        self._journalAppend(line)
@@ -0,0 +1,113 @@
+import random
+import pytest
+import benchmark
+from main import Group
+from conftest import assertTree, ownState
+
+
+def loadTree():
+    Group.bulkLoad(benchmark.syntheticRecords(60, fanout=2, prefix="Batch", attributes=2))
+
+
+def test_batch_delete_cancels_pending_subtree(emptyTree):
+    loadTree()
+    before = ownState()
+    with Group.batch() as batch:
+        batch.insert(("Genus", "Batch Pending", ("Family", "Batch Family 0"), None, {}, None))
+        batch.insert(("Species", "Batch Pending Species", ("Genus", "Batch Pending"), None, {}, (1, 2, 3)))
+        batch.edit("Species", "Batch Pending Species", "color", "Red")
+        batch.delete("Genus", "Batch Pending")
+    assert ownState() == before
+
+
+def test_batch_edit_then_delete(emptyTree):
+    loadTree()
+    with Group.batch() as batch:
+        batch.edit("Genus", "Batch Genus 1", "color", "Red")
+        batch.edit("Species", "Batch Species 0", "Weight", 5)
+        batch.edit("Genus", "Batch Genus 0", "color", "Green")
+        batch.delete("Genus", "Batch Genus 0")
+    assert ("Genus", "Batch Genus 0") not in Group._instances
+    assert Group._instances[("Genus", "Batch Genus 1")].attributes["color"] == "Red"
+    with pytest.raises(KeyError):
+        with Group.batch() as batch:
+            batch.delete("Genus", "Batch Genus 1")
+            batch.edit("Genus", "Batch Genus 1", "color", "Blue")
+    assertTree()
+
+
+def test_random_batches_match_sequential_changes(emptyTree):
+    random.seed(19)
+    loadTree()
+    model = ownState()
+    for round in range(25):
+        existing = set(model)
+        blocked = set()  # deleting these would also delete an insert of the batch, which a batch does not allow
+        with Group.batch() as batch:
+            for step in range(12):
+                keys = list(model)
+                key = random.choice(keys)
+                choice = random.random()
+                if choice < 0.35:
+                    superSet = random.choice([other for other in keys if other[0] != "Species"])
+                    if random.random() < 0.5:
+                        record = ("Genus", f"Batch New {round} {step}", superSet, None, {"Weight": step * 10}, None)
+                        attributes = dict(record[4])
+                    else:
+                        record = ("Species", f"Batch New {round} {step}", superSet, None, {}, (1, step * 20, 3))
+                        attributes = {"Age": 1, "Weight": step * 20, "Size": 3}
+                    batch.insert(record)
+                    model[record[:2]] = (superSet, attributes, None)
+                    while superSet is not None:
+                        if superSet in existing:
+                            blocked.add(superSet)
+                        superSet = model[superSet][0]
+                elif choice < 0.6:
+                    if key[0] == "Life" or key in blocked:
+                        continue
+                    batch.delete(*key)
+                    cancelled = {key}
+                    for other in keys:
+                        chain, superSet = [other], model[other][0]
+                        while superSet is not None and superSet not in cancelled:
+                            chain.append(superSet)
+                            superSet = model[superSet][0]
+                        if superSet is not None:
+                            cancelled.update(chain)
+                    for other in cancelled:
+                        del model[other]
+                else:
+                    attr, value = random.choice(["Weight", "color", "Attr 1"]), random.choice([None, 7, 250, "x", "300"])
+                    batch.edit(*key, attr, value)
+                    model[key][1][attr] = value
+        assert ownState() == model
+        assertTree()
+
+
+@pytest.mark.parametrize("name, failAt", [("_rebuildRollups", 1), ("_rebuildRollups", 3), ("_insertInterval", 1), ("_insertInterval", 3), ("_writeAttribute", 1), ("_writeAttribute", 2)])
+def test_failed_batch_is_rolled_back(emptyTree, monkeypatch, name, failAt):
+    loadTree()
+    before = ownState()
+    stats = {key: instance.stats() for key, instance in Group._instances.items()}
+    original = getattr(Group, name)
+    calls = []
+
+    def failing(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == failAt:
+            raise RuntimeError("injected")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(Group, name, staticmethod(failing))
+    with pytest.raises(RuntimeError):
+        with Group.batch() as batch:
+            batch.delete("Genus", "Batch Genus 2")
+            batch.insert(("Genus", "Batch Failing", ("Family", "Batch Family 0"), None, {"Weight": 500}, None))
+            batch.insert(("Species", "Batch Failing Species", ("Genus", "Batch Failing"), None, {}, (1, 2, 3)))
+            batch.insert(("Species", "Batch Failing Species 2", ("Genus", "Batch Genus 5"), None, {}, (1, 900, 3)))
+            batch.edit("Genus", "Batch Genus 1", "Weight", 1000)
+            batch.edit("Species", "Batch Species 40", "Weight", 2000)
+    monkeypatch.undo()
+    assert ownState() == before
+    assert {key: instance.stats() for key, instance in Group._instances.items()} == stats
+    assertTree()
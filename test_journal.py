@@ -0,0 +1,123 @@
+import os
+import pytest
+import benchmark
+from main import Group, JournalFormatException
+from conftest import clearTree, ownState
+
+
+@pytest.fixture
+def paths(emptyTree, tmp_path):
+    yield str(tmp_path / "journal.log"), str(tmp_path / "base.snapshot")
+    Group.closeJournal()
+
+
+def crash():
+    """
+    Drops the open journal without closing it, like a process that stops, and empties the tree.
+    """
+    journal = Group._journal
+    Group._journal = None
+    if journal is not None and not journal._file.closed:
+        journal._file.close()
+    clearTree()
+
+
+def change(step: int) -> None:
+    Group.bulkLoad(benchmark.syntheticRecords(20, fanout=2, prefix=f"Journal {step}", attributes=2))
+    Group._instances[("Genus", f"Journal {step} Genus 1")].info = ("tags", ("a", ("b", 1), [2, {"c": None}]))
+    with Group.batch() as batch:
+        batch.delete("Genus", f"Journal {step} Genus 2")
+        batch.edit("Species", f"Journal {step} Species 3", "pair", (1, 2))
+    Group.delete("Family", f"Journal {step} Family 3")
+
+
+def test_journal_drops_torn_tail(paths):
+    journal, base = paths
+    Group.openJournal(journal, base)
+    change(0)
+    expected = ownState()
+    Group.closeJournal()
+    size = os.path.getsize(journal)
+    with open(journal, "ab") as f:
+        f.write(b'["edit","Genus","Journal 0 Genus 1","w",')
+    clearTree()
+    assert Group.openJournal(journal, base)["replayed"] == 4
+    assert ownState() == expected
+    assert os.path.getsize(journal) == size
+    assert Group._instances[("Species", "Journal 0 Species 3")].attributes["pair"] == (1, 2)
+
+
+def test_journal_rejects_corruption_in_the_middle(paths):
+    journal, base = paths
+    Group.openJournal(journal, base)
+    change(0)
+    Group.closeJournal()
+    with open(journal, "rb") as f:
+        lines = f.read().split(b"\n")
+    data = b"\n".join(lines[:2] + [b"xx"] + lines[2:])
+    with open(journal, "wb") as f:
+        f.write(data)
+    clearTree()
+    with pytest.raises(JournalFormatException):
+        Group.openJournal(journal, base)
+    with open(journal, "rb") as f:
+        assert f.read() == data
+
+
+def test_journal_of_another_base_is_not_dropped(paths):
+    journal, base = paths
+    Group.openJournal(journal)
+    change(0)
+    Group.closeJournal()
+    Group.saveSnapshot(base)
+    with open(journal, "rb") as f:
+        data = f.read()
+    clearTree()
+    with pytest.raises(JournalFormatException):
+        Group.openJournal(journal, base)
+    with open(journal, "rb") as f:
+        assert f.read() == data
+
+
+def test_value_the_journal_cannot_hold_changes_nothing(paths):
+    journal, base = paths
+    Group.openJournal(journal, base)
+    change(0)
+    genus = Group._instances[("Genus", "Journal 0 Genus 1")]
+    size = os.path.getsize(journal)
+    with pytest.raises(TypeError):
+        genus.info = ("tags", {"a"})
+    with pytest.raises(TypeError):
+        Group(type="Genus", name="Journal Set", superSet=("Family", "Journal 0 Family 0"), attributes={"tags": {"a"}})
+    assert genus.attributes["tags"] == ("a", ("b", 1), [2, {"c": None}])
+    assert ("Genus", "Journal Set") not in Group._instances
+    assert os.path.getsize(journal) == size
+
+
+@pytest.mark.parametrize("failing", ["saveSnapshot", "replace base", "create journal"])
+def test_compaction_survives_a_crash(paths, monkeypatch, failing):
+    journal, base = paths
+    Group.openJournal(journal, base)
+    change(0)
+    Group.compactJournal()
+    change(1)
+    expected = ownState()
+    if failing == "saveSnapshot":
+        def fail(*args, **kwargs):
+            raise RuntimeError("injected")
+        monkeypatch.setattr(Group, "saveSnapshot", staticmethod(fail))
+    else:
+        replace, calls = os.replace, []
+
+        def fail(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == (1 if failing == "replace base" else 2):
+                raise RuntimeError("injected")
+            return replace(*args, **kwargs)
+        monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(RuntimeError):
+        Group.compactJournal()
+    monkeypatch.undo()
+    crash()
+    Group.openJournal(journal, base)
+    assert ownState() == expected
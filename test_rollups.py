@@ -0,0 +1,25 @@
+import random
+import benchmark
+from main import Group, Species
+from conftest import assertRollups
+
+
+def test_rollups_follow_inserts_edits_and_deletes(emptyTree):
+    random.seed(15)
+    Group.bulkLoad(benchmark.syntheticRecords(120, fanout=2, prefix="Roll", attributes=3))
+    for step in range(150):
+        keys = list(Group._instances)
+        key = random.choice(keys)
+        groups = [current for current in keys if current[0] != "Species"]
+        choice = random.random()
+        if choice < 0.15 and key[0] != "Life":
+            Group.delete(*key)
+        elif choice < 0.55:
+            Group._instances[key].info = (random.choice(["Weight", "Age", "Attr 1", "legs"]), random.choice([None, 0, 5, -3.5, 1000, "12", "x"]))
+        elif choice < 0.85:
+            Species(name=f"Roll New {step}", superSet=random.choice(groups), age=random.randint(0, 99), weight=random.randint(-5, 2000), size="3", info=None, attributes={"legs": step})
+        else:
+            Group(type="Genus", name=f"Roll Genus New {step}", superSet=random.choice(groups), attributes={"Weight": step})
+        if step % 10 == 0:
+            assertRollups(random.sample(list(Group._instances), 10))
+    assertRollups(list(Group._instances))
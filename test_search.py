@@ -0,0 +1,33 @@
+from main import Filter, Group
+
+
+def test_batched_regex_matches_anchors_like_per_name(sampleTree):
+    for query in (r"Genus A\Z", r"\AGenus A", r"Genus A(?!x)", r"(?i)genus a", r"Genus .*"):
+        assert Group.advancedSearch(query=query, match_type="regular expression", batched=True) == Group.advancedSearch(query=query, match_type="regular expression")
+    assert ("Genus", "Genus A") in Group.advancedSearch(query=r"Genus A\Z", match_type="regular expression", batched=True)
+
+
+def test_search_cache_keeps_values_of_different_types_apart(emptyTree):
+    Group.bulkLoad([
+        ("Life", "Typed Life", None, None, {}, None),
+        ("Genus", "Typed True", ("Life", "Typed Life"), None, {"flag": True}, None),
+        ("Genus", "Typed One", ("Life", "Typed Life"), None, {"flag": 1}, None),
+    ])
+    for first, second in ((True, 1), (1, True), ("1", 1)):
+        expected = set(Group._filterCandidates({"flag": ("exact", second)}))
+        Group.clearSearchCache()
+        Group.advancedSearch(filters={"flag": ("exact", first)})
+        assert set(Group.advancedSearch(filters={"flag": ("exact", second)})) == expected
+    assert Filter("flag", "exact", True) != Filter("flag", "exact", 1)
+
+
+def test_filters_skip_deleted_nodes(emptyTree):
+    records = [("Life", "Dead Life", None, None, {}, None)]
+    records += [("Genus", f"Dead Genus {i}", ("Life", "Dead Life"), None, {}, None) for i in range(2)]
+    records += [("Species", f"Dead Species {i}", ("Genus", f"Dead Genus {i % 100 // 99}"), None, {"color": "Blue"}, (1, i, 1)) for i in range(200)]
+    Group.bulkLoad(records)
+    Group.delete("Genus", "Dead Genus 1")
+    blue = {key for key, instance in Group._instances.items() if instance.attributes.get("color") == "Blue"}
+    assert set(Group.advancedSearch(filters=Filter("Weight", "gte", 0) | Filter("color", "exact", "Blue"))) == blue
+    assert set(Group.advancedSearch(filters=Filter.fromDict({}))) == set(Group._instances)
+    assert set(Group.advancedSearch(filters=~Filter.fromDict({}) | Filter("color", "exact", "Blue"))) == blue
@@ -0,0 +1,78 @@
+import pytest
+import benchmark
+from main import Filter, Group, SnapshotFormatException
+from conftest import clearTree
+
+
+def treeState():
+    """
+    Returns every instance as (super group, own attributes with their types, brief info), keyed by (type, name) in insertion order, and the rendered tree.
+    """
+    instances = {key: (instance.superSet, {attr: (type(value), value) for attr, value in instance.attributes.maps[0].items()}, instance._info) for key, instance in Group._instances.items()}
+    return list(instances.items()), Group.fullTreeText()
+
+
+def test_snapshot_round_trip(sampleTree, tmp_path):
+    path = str(tmp_path / "sample.snapshot")
+    genus = Group._instances[("Genus", "Genus B")]
+    for attr, value in (("color", "Dark Blue"), ("legs", 4), ("weight", 2.5), ("alive", True), ("note", None)):
+        genus.info = (attr, value)
+    before = treeState()
+    assert Group.saveSnapshot(path) == len(Group._instances)
+
+    clearTree()
+    assert not Group._instances
+    assert Group.loadSnapshot(path) == len(before[0])
+    assert treeState() == before
+
+
+def indexState():
+    """
+    Returns the answers of the search indexes, the rollups and the Euler tour for the current tree.
+    """
+    searches = [
+        Group.advancedSearch(query="ch 1", match_type="inclusive"),
+        Group.advancedSearch(query="Species 1.*3$", match_type="regular expression"),
+        Group.advancedSearch(superSet=("Class", "Snap Class 2"), filters={"Weight": ("gte", 10)}),
+        Group.advancedSearch(filters=Filter("color", "exact", "red") | Filter("Rank", "lt", 2)),
+        Group.advancedSearch(order_by="-Weight", limit=15),
+        Group.suggest("snap g", 5),
+    ]
+    species = sorted(Group._typeIndex["Species"], key=lambda key: Group._instances[key]._serial)
+    return ([list(result) for result in searches], Group.rollup("Genus"), Group.rollup("Life"),
+            Group.lca(species[0], species[-1]), Group.fullTreeText())
+
+
+def test_snapshot_restores_indexes(emptyTree, tmp_path):
+    path = str(tmp_path / "synthetic.snapshot")
+    Group.bulkLoad(benchmark.syntheticRecords(400, fanout=2, prefix="Snap", attributes=3))
+    for key in list(Group._instances)[5::37]:
+        if key in Group._instances and key[0] != "Life":
+            Group.delete(*key)
+    before = treeState(), indexState()
+    Group.saveSnapshot(path)
+
+    clearTree()
+    Group.loadSnapshot(path)
+    assert (treeState(), indexState()) == before
+    Group.delete("Genus", "Snap Genus 3")
+    Group.bulkLoad([("Species", "Snap Species New", ("Genus", "Snap Genus 4"), None, {"Weight": 1000}, (1, 1000, 1))])
+    restored = treeState(), indexState()
+
+    clearTree()
+    Group.bulkLoad(benchmark.syntheticRecords(1, prefix="Other"))  # not an empty tree, so the snapshot goes through bulkLoad
+    Group.loadSnapshot(path)
+    Group.delete("Life", "Other Life")
+    Group.delete("Genus", "Snap Genus 3")
+    Group.bulkLoad([("Species", "Snap Species New", ("Genus", "Snap Genus 4"), None, {"Weight": 1000}, (1, 1000, 1))])
+    assert (treeState(), indexState()) == restored
+
+
+def test_snapshot_rejects_truncated_file(sampleTree, tmp_path):
+    path = tmp_path / "sample.snapshot"
+    Group.saveSnapshot(str(path))
+    path.write_bytes(path.read_bytes()[:-8])
+    clearTree()
+    with pytest.raises(SnapshotFormatException):
+        Group.loadSnapshot(str(path))
+    assert not Group._instances